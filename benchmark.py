@@ -0,0 +1,4 @@
+from compress_classify.benchmark import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Классификация текстов по сжатию: прирост размера архива ядра темы
+после добавления статьи. Тяжёлые модули импортируются при первом обращении.
+"""
+import importlib
+
+_LAZY = {
+    "BACKENDS": "backends",
+    "make_backend": "backends",
+    "find_7z": "backends",
+    "CoreRegistry": "core_registry",
+    "list_cores": "core_registry",
+    "shared_registry": "core_registry",
+    "classify_text_with_zips": "classification",
+    "classify_texts": "classification",
+    "CoreStore": "core_store",
+    "DeltaMatrix": "delta_matrix",
+    "ResultCache": "result_cache",
+    "open_cache": "result_cache",
+    "METRICS": "metrics",
+    "Normalizer": "normalize",
+    "make_normalizer": "normalize",
+}
+
+__all__ = sorted(_LAZY)
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
@@ -0,0 +1,232 @@
+import os
+import bz2
+import lzma
+import zlib
+import atexit
+import shutil
+import logging
+import platform
+import tempfile
+import threading
+import subprocess
+
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Корень проекта: рядом с пакетом лежит tools/7zip.
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_zip_tool = None
+
+def find_7z():
+    """Путь к 7z из tools/7zip; определяется один раз на процесс."""
+    global _zip_tool
+    if _zip_tool is None:
+        name = "7za.exe" if platform.system() == "Windows" else "7z"
+        _zip_tool = os.path.join(PROJECT_DIR, "tools", "7zip", name)
+    return _zip_tool
+
+def read_core_text(zip_tool, core_path):
+    """
+    Распаковать ядро в память: содержимое всех файлов архива подряд.
+    Ядро может быть и папкой с .txt (например, в benchmark.py) — тогда 7z не нужен.
+    """
+    with METRICS.timer("core_extract"):
+        if os.path.isdir(core_path):
+            parts = []
+            for name in sorted(os.listdir(core_path)):
+                if name.endswith(".txt"):
+                    with open(os.path.join(core_path, name), "rb") as f:
+                        parts.append(f.read())
+            data = b"".join(parts)
+        else:
+            METRICS.count("spawns")
+            data = subprocess.run(
+                [zip_tool, "x", "-so", core_path],
+                check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            ).stdout
+    METRICS.count("bytes_read", len(data))
+    return data
+
+def private_workdir(prefix):
+    """Личная временная папка запуска, по возможности в RAM (/dev/shm)."""
+    ram = "/dev/shm"
+    base = ram if os.path.isdir(ram) and os.access(ram, os.W_OK) else None
+    workdir = tempfile.mkdtemp(prefix=prefix, dir=base)
+    atexit.register(shutil.rmtree, workdir, True)
+    return workdir
+
+def read_article(text_file):
+    with METRICS.timer("read_article"):
+        with open(text_file, "rb") as f:
+            data = f.read()
+    METRICS.count("bytes_read", len(data))
+    return data
+
+class SevenZipBackend:
+    """
+    Исходный способ на внешнем 7z: прирост размера архива ядра после
+    добавления в него текста. Ядро не копируется: 7z с ключами
+    -u- -u...!новый_архив читает ядро и пишет "ядро + текст" в личную
+    папку запуска, исходный архив не меняется. Размер ядра C(ядро)
+    запоминается при подготовке ядра.
+    """
+    name = "7z"
+    in_memory = False
+    streamable = False
+    # Действия обновления как у команды "a" по умолчанию.
+    UPDATE_ACTIONS = "p1q1r2x1y2z1w2"
+
+    def __init__(self, zip_tool, level=None):
+        self.zip_tool = zip_tool
+        self.level = level
+        self.workdir = private_workdir("cc7z_")
+
+    def prime(self, core_path):
+        return core_path, os.path.getsize(core_path)
+
+    def score(self, state, text_file, data=None):
+        core_path, base = state
+        category = os.path.splitext(os.path.basename(core_path))[0]
+        out = os.path.join(
+            self.workdir, f"{category}_{os.getpid()}_{threading.get_ident()}.7z"
+        )
+        cmd = [self.zip_tool, "a", core_path, "-u-", f"-u{self.UPDATE_ACTIONS}!{out}"]
+        if self.level is not None:
+            cmd.append(f"-mx={self.level}")
+        try:
+            with METRICS.timer("7z_spawn"):
+                subprocess.run(
+                    cmd + [text_file],
+                    check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                )
+            METRICS.count("spawns")
+            if METRICS.enabled:
+                METRICS.count("bytes_compressed", os.path.getsize(text_file))
+            with METRICS.timer("stat"):
+                size = os.path.getsize(out)
+            METRICS.count("bytes_written", size)
+            return size - base
+        finally:
+            try:
+                if os.path.exists(out):
+                    os.remove(out)
+            except OSError as e:
+                logger.warning(f"Не удалось удалить {out}: {e}")
+
+class _InProcessBackend:
+    """
+    Сжатие в памяти процесса: C(ядро + текст) - C(ядро).
+    Текст ядра распаковывается через 7z один раз при подготовке ядра.
+    """
+    name = None
+    default_level = None
+    in_memory = True
+    streamable = False
+
+    def __init__(self, zip_tool, level=None):
+        self.zip_tool = zip_tool
+        self.level = self.default_level if level is None else level
+
+    def compress(self, data):
+        raise NotImplementedError
+
+    def prime(self, core_path):
+        return self.prime_data(read_core_text(self.zip_tool, core_path))
+
+    def prime_data(self, core):
+        """Подготовить ядро из байтов (например, текст статьи в updateCore)."""
+        return core, len(self.compress(core))
+
+    def prime_sized(self, core):
+        """prime_data и C(core) за одно сжатие (столбец матрицы в updateCore)."""
+        state = self.prime_data(core)
+        return state, state[1]
+
+    def score(self, state, text_file, data=None):
+        if data is None:
+            data = read_article(text_file)
+        return self.score_data(state, data)
+
+    def score_data(self, state, data):
+        core, base = state
+        with METRICS.timer("compress"):
+            size = len(self.compress(core + data))
+        METRICS.count("bytes_compressed", len(core) + len(data))
+        return size - base
+
+class LzmaBackend(_InProcessBackend):
+    name = "lzma"
+    default_level = 6
+
+    def compress(self, data):
+        return lzma.compress(data, preset=self.level)
+
+class Bz2Backend(_InProcessBackend):
+    name = "bz2"
+    default_level = 9
+
+    def compress(self, data):
+        return bz2.compress(data, compresslevel=self.level)
+
+class ZlibBackend(_InProcessBackend):
+    """
+    zlib умеет копировать состояние компрессора, поэтому ядро сжимается
+    один раз, а для каждой статьи берётся копия прогретого compressobj:
+    стоимость пары статья×ядро зависит только от размера статьи.
+    """
+    name = "zlib"
+    default_level = 9
+    streamable = True
+    # Окно deflate: дальше 32 КБ от текущей позиции ядро уже не видно.
+    window = 32768
+
+    def compress(self, data):
+        return zlib.compress(data, self.level)
+
+    def prime_data(self, core):
+        return self.prime_sized(core)[0]
+
+    def prime_sized(self, core):
+        # Вывод compressobj с теми же параметрами совпадает с zlib.compress.
+        warm = zlib.compressobj(self.level)
+        head = len(warm.compress(core))
+        tail = len(warm.copy().flush())
+        return (warm, tail), head + tail
+
+    def score_data(self, state, data):
+        warm, tail = state
+        with METRICS.timer("compress"):
+            fork = warm.copy()
+            size = len(fork.compress(data)) + len(fork.flush())
+        METRICS.count("bytes_compressed", len(data))
+        return size - tail
+
+    def stream(self, state):
+        return ZlibStream(*state)
+
+class ZlibStream:
+    """Потоковая оценка: статья подаётся кусками в копию прогретого ядра."""
+
+    def __init__(self, warm, tail):
+        self._fork = warm.copy()
+        self._out = 0
+        self._tail = tail
+
+    def feed(self, chunk):
+        self._out += len(self._fork.compress(chunk))
+        METRICS.count("bytes_compressed", len(chunk))
+
+    def delta(self):
+        """Прирост для уже поданной части статьи."""
+        return self._out + len(self._fork.copy().flush()) - self._tail
+
+BACKENDS = {
+    b.name: b for b in (SevenZipBackend, LzmaBackend, Bz2Backend, ZlibBackend)
+}
+
+def make_backend(name, zip_tool, level=None):
+    if name not in BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд: {name}")
+    return BACKENDS[name](zip_tool, level)
@@ -0,0 +1,74 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import time
+
+from .core_registry import CoreRegistry
+from .metrics import METRICS
+from .result_cache import open_worker_cache
+
+_registry = None
+_zip_cores = None
+
+def _init_worker(backend, zip_cores, cache_path=None, cache_size=None, profile=False):
+    global _registry, _zip_cores
+    # При fork рабочий процесс наследует накопленные родителем метрики.
+    METRICS.snapshot(reset=True)
+    METRICS.enabled = profile
+    cache = open_worker_cache(cache_path, cache_size) if cache_path else None
+    _registry = CoreRegistry(backend, cache)
+    _zip_cores = zip_cores
+
+def _score_chunk(task):
+    submitted, chunk = task
+    if METRICS.enabled:
+        METRICS.add_time("queue_wait", time.time() - submitted)
+    results = []
+    data_file, data, text_hash = None, None, None
+    for idx, text_file, category in chunk:
+        if text_file != data_file:
+            data_file = text_file
+            data, text_hash = _registry.read_text(text_file)
+        diff = _registry.diff(_zip_cores[category], text_file, data, text_hash)
+        results.append((idx, category, diff))
+    return results, METRICS.snapshot(reset=True) if METRICS.enabled else None
+
+def iter_chunks(pairs, chunksize):
+    """Нарезать список пар (индекс статьи, статья, категория) на задачи по chunksize."""
+    for start in range(0, len(pairs), chunksize):
+        yield pairs[start:start + chunksize]
+
+def score_pairs(pairs, n_texts, zip_cores, backend, jobs=None, chunksize=None, cache=None):
+    """
+    Посчитать приросты для списка пар (индекс статьи, статья, категория) на
+    одном пуле процессов. Возвращает n_texts словарей {категория: прирост}.
+    Если передан кеш, каждый процесс открывает тот же файл кеша.
+    """
+    if not chunksize:
+        chunksize = max(1, len(zip_cores))
+    grid = [{} for _ in range(n_texts)]
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(
+            backend, zip_cores,
+            cache.path if cache else None, cache.max_entries if cache else None,
+            METRICS.enabled
+        )
+    ) as executor:
+        tasks = ((time.time(), chunk) for chunk in iter_chunks(pairs, chunksize))
+        for results, snap in executor.map(_score_chunk, tasks):
+            METRICS.merge(snap)
+            for idx, category, diff in results:
+                if diff is not None:
+                    grid[idx][category] = diff
+    return grid
+
+def score_grid(text_files, zip_cores, backend, jobs=None, chunksize=None, cache=None):
+    """Вся сетка статьи×ядра (по строкам) на одном пуле процессов, см. score_pairs."""
+    categories = sorted(zip_cores)
+    pairs = [
+        (idx, text_file, category)
+        for idx, text_file in enumerate(text_files)
+        for category in categories
+    ]
+    return score_pairs(pairs, len(text_files), zip_cores, backend, jobs, chunksize, cache)
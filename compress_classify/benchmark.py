@@ -0,0 +1,512 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+
+from .backends import BACKENDS, find_7z, make_backend
+from .batch import score_grid
+from .core_registry import CoreRegistry
+from . import metrics, normalize
+from .metrics import METRICS
+
+LATIN = "abcdefghijklmnopqrstuvwxyz"
+CYRILLIC = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+
+def _words(rng, alphabet, count):
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(2, 11)))
+        for _ in range(count)
+    ]
+
+def _text(rng, own, common, size, share=0.45):
+    words, length = [], 0
+    while length < size:
+        pool = own if rng.random() < share else common
+        # Квадрат случайного числа даёт убывающие частоты, похожие на закон Ципфа.
+        w = pool[int(len(pool) * rng.random() ** 2)]
+        words.append(w)
+        length += len(w.encode("utf-8")) + 1
+    return " ".join(words)
+
+def _boilerplate(rng, text, common, header, width=80, lines_per_page=40, references=0.25):
+    """
+    Текст в виде, какой даёт извлечение из PDF: строки по width символов
+    с переносами слов, колонтитул и номер страницы каждые lines_per_page
+    строк, двойные пробелы, лигатуры и список литературы из общих слов.
+    """
+    lines, line, page = [], "", 1
+    for word in text.split(" "):
+        if len(line) + len(word) + 1 > width:
+            if len(word) > 5 and rng.random() < 0.3:
+                cut = len(word) // 2
+                lines.append(f"{line} {word[:cut]}-")
+                line = word[cut:]
+                continue
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line}{'  ' if rng.random() < 0.1 else ' '}{word}" if line else word
+        if len(lines) % lines_per_page == lines_per_page - 1:
+            lines += ["", header, str(page), ""]
+            page += 1
+    lines.append(line)
+    refs = ["", "Список литературы"]
+    size = int(len(text) * references)
+    while sum(len(r) for r in refs) < size:
+        refs.append(f"{len(refs) - 1}. " + " ".join(rng.choice(common) for _ in range(8)) + f", {rng.randint(1990, 2024)}.")
+    return "\n".join(lines + refs).replace("fi", "\ufb01")
+
+def generate_corpus(workdir, articles, size, categories, core_size, candidates,
+                    alphabet="latin", seed=1, boilerplate=False):
+    """
+    Синтетический корпус в workdir:
+      articles/<тема>/*.txt   — статьи для классификации,
+      cores/<тема>/*.txt      — ядра-папки (читаются без 7z),
+      candidates/<тема>/*.txt — кандидаты для отладки ядра.
+    articles — общее число статей, size — байт в статье. С boilerplate
+    статьи похожи на извлечённые из PDF (см. _boilerplate).
+    """
+    rng = random.Random(seed)
+    letters = CYRILLIC if alphabet == "cyrillic" else LATIN
+    common = _words(rng, letters, 3000)
+    names = [f"cat{i:03d}" for i in range(categories)]
+    per_cat = max(1, articles // categories)
+    for name in names:
+        own = _words(rng, letters, 800)
+        header = f"Вестник {name}. 2024. № {rng.randint(1, 12)}"
+        for sub, count in (("articles", per_cat), ("cores", core_size), ("candidates", candidates)):
+            folder = os.path.join(workdir, sub, name)
+            os.makedirs(folder, exist_ok=True)
+            for i in range(count):
+                text = _text(rng, own, common, size)
+                if boilerplate:
+                    text = _boilerplate(rng, text, common, header)
+                with open(os.path.join(folder, f"{sub}_{i:04d}.txt"), "w", encoding="utf-8") as f:
+                    f.write(text)
+    return names
+
+def _list(folder):
+    return sorted(
+        os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".txt")
+    )
+
+def _texts(workdir, sub="articles"):
+    root = os.path.join(workdir, sub)
+    return [
+        (cat, path)
+        for cat in sorted(os.listdir(root))
+        for path in _list(os.path.join(root, cat))
+    ]
+
+def _cores(workdir):
+    root = os.path.join(workdir, "cores")
+    return {cat: os.path.join(root, cat) for cat in sorted(os.listdir(root))}
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    return round(peak * scale / 2 ** 20, 1)
+
+def _best(diffs):
+    return min(diffs.items(), key=lambda x: (x[1], x[0]))[0] if diffs else None
+
+def stage_classify(cfg):
+    """Классификация по одной статье: задержка на статью и пары/с."""
+    backend = make_backend(cfg["backend"], None, cfg["level"])
+    registry = CoreRegistry(backend)
+    zip_cores = _cores(cfg["workdir"])
+    texts = _texts(cfg["workdir"])
+
+    t0 = time.perf_counter()
+    for core in zip_cores.values():
+        registry.primed(core)
+    prime_s = time.perf_counter() - t0
+
+    latencies, correct = [], 0
+    metrics.enable()
+    METRICS.snapshot(reset=True)
+    t0 = time.perf_counter()
+    for cat, path in texts:
+        t = time.perf_counter()
+        diffs = registry.diffs(zip_cores, path, cfg["threads"])
+        latencies.append(time.perf_counter() - t)
+        correct += _best(diffs) == cat
+    total_s = time.perf_counter() - t0
+    # Байты считает сам бэкенд при каждом сжатии.
+    nbytes = METRICS.snapshot()["counters"].get("bytes_compressed", 0)
+    pairs = len(texts) * len(zip_cores)
+    return {
+        "articles": len(texts),
+        "cores": len(zip_cores),
+        "pairs": pairs,
+        "prime_s": round(prime_s, 4),
+        "total_s": round(total_s, 4),
+        "pairs_per_s": round(pairs / total_s, 1) if total_s else None,
+        "latency_p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "latency_p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "bytes_compressed": nbytes,
+        "bytes_per_classification": round(nbytes / len(texts)) if texts else 0,
+        "accuracy": round(correct / len(texts) * 100, 2) if texts else 0.0,
+    }
+
+def stage_batch(cfg):
+    """Пакетный режим (batch.score_grid): масштабирование по числу процессов."""
+    backend = make_backend(cfg["backend"], None, cfg["level"])
+    zip_cores = _cores(cfg["workdir"])
+    files = [path for _, path in _texts(cfg["workdir"])]
+    pairs = len(files) * len(zip_cores)
+    runs = []
+    for jobs in cfg["jobs"]:
+        t0 = time.perf_counter()
+        score_grid(files, zip_cores, backend, jobs)
+        total_s = time.perf_counter() - t0
+        runs.append({"jobs": jobs, "total_s": round(total_s, 4), "pairs_per_s": round(pairs / total_s, 1)})
+    base = runs[0]["pairs_per_s"] / runs[0]["jobs"] if runs else None
+    for run in runs:
+        run["efficiency"] = round(run["pairs_per_s"] / (base * run["jobs"]), 3)
+    return {"pairs": pairs, "runs": runs}
+
+def stage_core_build(cfg):
+    """
+    Сборка ядер как в updateCore: build_matrices (общий пул на все темы)
+    без хранилища матриц, с новым хранилищем и повторно с заполненным —
+    тогда все пары берутся из него. Затем жадный выбор select_core_indices.
+    """
+    from .matrix_store import open_store
+    from .update_core import build_matrices, select_core_indices
+
+    backend = make_backend(cfg["backend"], None, cfg["level"])
+    root = os.path.join(cfg["workdir"], "articles")
+    categories = {
+        cat: _list(os.path.join(root, cat))
+        for cat in sorted(os.listdir(root))[:cfg["build_categories"]]
+    }
+    jobs = max(cfg["jobs"])
+    store_path = os.path.join(cfg["workdir"], "matrix_store.sqlite")
+
+    times, matrices = {}, {}
+    for run in ("no_store", "store_cold", "store_warm"):
+        store = None if run == "no_store" else open_store(store_path)
+        t0 = time.perf_counter()
+        try:
+            matrices[run] = build_matrices(categories, None, backend, jobs, store=store, progress=False)
+        finally:
+            if store is not None:
+                store.close()
+        times[run] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for cat, mat in matrices["no_store"].items():
+        select_core_indices(mat, min(cfg["core_size"], len(categories[cat])))
+    select_s = time.perf_counter() - t0
+    pairs = sum(len(files) ** 2 for files in categories.values())
+    return {
+        "categories": len(categories),
+        "jobs": jobs,
+        "pairs": pairs,
+        "matrix_s": round(times["no_store"], 4),
+        "store_cold_s": round(times["store_cold"], 4),
+        "store_warm_s": round(times["store_warm"], 4),
+        "select_s": round(select_s, 4),
+        "pairs_per_s": round(pairs / times["no_store"], 1) if times["no_store"] else None,
+        # Матрицы из хранилища должны совпадать с посчитанными заново.
+        "store_consistent": all(
+            (matrices["store_warm"][cat] == mat).all() for cat, mat in matrices["no_store"].items()
+        ),
+    }
+
+def _zip_tool():
+    """7z для этапов, которые запускают настоящие DebugCores и CoreCreater, или None."""
+    zip_tool = find_7z()
+    return zip_tool if os.path.isfile(zip_tool) else None
+
+def stage_debug(cfg):
+    """
+    Отладка ядер настоящим DebugCores: ядра — архивы 7z синтетических ядер,
+    кандидаты — candidates/. Базовый проход compute_accuracy_per_category,
+    затем debug_cores для debug_categories худших тем.
+    """
+    zip_tool = _zip_tool()
+    if zip_tool is None:
+        return {"skipped": f"нет 7z: {find_7z()}"}
+    from . import debug_cores
+
+    work = os.path.join(cfg["workdir"], "debug")
+    cores = os.path.join(work, "cores")
+    os.makedirs(cores, exist_ok=True)
+    for cat, folder in _cores(cfg["workdir"]).items():
+        debug_cores.create_7z_archive(os.path.join(cores, f"{cat}.7z"), _list(folder), zip_tool,
+                                      category_name=cat)
+    argv = [
+        "--root-folder", os.path.join(cfg["workdir"], "articles"),
+        "--cores-folder", cores,
+        "--test-folder", os.path.join(cfg["workdir"], "candidates"),
+        "--max-debug-articles", str(cfg["core_size"]),
+        "--candidate-jobs", str(cfg["candidate_jobs"]),
+        "--backend", cfg["backend"],
+        "--stub-store", os.path.join(work, "core_store"),
+        "--seed", "1",
+        "--no-cache",
+    ]
+    if cfg["level"] is not None:
+        argv += ["--level", str(cfg["level"])]
+    if cfg["threads"]:
+        argv += ["--max-workers", str(cfg["threads"])]
+    args = debug_cores.build_parser().parse_args(argv)
+
+    metrics.enable()
+    cwd = os.getcwd()
+    # Чекпоинты DebugCores пишутся в текущую папку.
+    os.chdir(work)
+    try:
+        debug_cores.configure(args)
+        baseline = {}
+        t0 = time.perf_counter()
+        accs = debug_cores.compute_accuracy_per_category(
+            args.root_folder, args.cores_folder, zip_tool, None, baseline
+        )
+        baseline_s = time.perf_counter() - t0
+        categories = debug_cores.select_categories(accs, bottom=cfg["debug_categories"])
+        t0 = time.perf_counter()
+        chosen = debug_cores.debug_cores(categories, 1, baseline)
+        debug_s = time.perf_counter() - t0
+    finally:
+        os.chdir(cwd)
+
+    snap = METRICS.snapshot()
+    evaluated = snap["counters"].get("candidates", 0)
+    calls, seconds = snap["timers"].get("evaluate_candidate", [0, 0.0])
+    return {
+        "categories": categories,
+        "test_articles": len(baseline),
+        "candidates": evaluated,
+        "baseline_s": round(baseline_s, 4),
+        "debug_s": round(debug_s, 4),
+        "candidates_per_s": round(evaluated / debug_s, 1) if debug_s else None,
+        "evaluate_candidate_ms": round(seconds / calls * 1000, 3) if calls else None,
+        "accuracy_before": {c: round(accs[c], 2) for c in categories},
+        "accuracy_after": {
+            c: round(chosen[c][1], 2) for c in categories
+            if c in chosen and chosen[c][1] is not None
+        },
+    }
+
+def stage_core_create(cfg):
+    """
+    Формирование ядер CoreCreater (core_creator.move_and_archive) из копии
+    статей: core_size случайных статей каждой темы переносятся и архивируются.
+    """
+    zip_tool = _zip_tool()
+    if zip_tool is None:
+        return {"skipped": f"нет 7z: {find_7z()}"}
+    from .core_creator import move_and_archive
+
+    work = os.path.join(cfg["workdir"], "create")
+    source, output = os.path.join(work, "source"), os.path.join(work, "cores")
+    shutil.rmtree(work, ignore_errors=True)
+    shutil.copytree(os.path.join(cfg["workdir"], "articles"), source)
+    t0 = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        move_and_archive(source, output, cfg["core_size"])
+    total_s = time.perf_counter() - t0
+    archives = [os.path.join(output, f) for f in os.listdir(output) if f.endswith(".7z")]
+    return {
+        "categories": len(archives),
+        "files_per_core": cfg["core_size"],
+        "total_s": round(total_s, 4),
+        "core_s": round(total_s / len(archives), 4) if archives else None,
+        "archive_bytes": sum(os.path.getsize(a) for a in archives),
+    }
+
+def stage_normalize(cfg):
+    """
+    Влияние нормализации: классификация исходных статей исходными ядрами и
+    нормализованных — ядрами из нормализованных статей. Байты на одну
+    классификацию (статья × все ядра), время и точность.
+    """
+    normalizer = normalize.make_normalizer(cfg["normalize"] or "all", cfg["max_bytes"])
+    backend = make_backend(cfg["backend"], None, cfg["level"])
+    texts = _texts(cfg["workdir"])
+    raw_cores = _cores(cfg["workdir"])
+
+    t0 = time.perf_counter()
+    norm_cores = {}
+    for cat, folder in raw_cores.items():
+        out = os.path.join(cfg["workdir"], "cores_norm", cat)
+        os.makedirs(out, exist_ok=True)
+        for src in _list(folder):
+            shutil.copy(normalizer.path(src), out)
+        norm_cores[cat] = out
+    sources = [normalizer.path(path) for _, path in texts]
+    normalize_s = time.perf_counter() - t0
+
+    metrics.enable()
+    runs = {}
+    for name, zip_cores, files in (
+        ("raw", raw_cores, [path for _, path in texts]),
+        ("normalized", norm_cores, sources),
+    ):
+        registry = CoreRegistry(backend)
+        correct = 0
+        METRICS.snapshot(reset=True)
+        t0 = time.perf_counter()
+        for (cat, _), path in zip(texts, files):
+            correct += _best(registry.diffs(zip_cores, path, cfg["threads"])) == cat
+        total_s = time.perf_counter() - t0
+        nbytes = METRICS.snapshot()["counters"].get("bytes_compressed", 0)
+        runs[name] = {
+            "total_s": round(total_s, 4),
+            "bytes_compressed": nbytes,
+            "bytes_per_classification": round(nbytes / len(texts)) if texts else 0,
+            "accuracy": round(correct / len(texts) * 100, 2) if texts else 0.0,
+        }
+    raw, norm = runs["raw"], runs["normalized"]
+    return {
+        "steps": list(normalizer.steps),
+        "max_bytes": normalizer.max_bytes,
+        "normalize_s": round(normalize_s, 4),
+        "raw": raw,
+        "normalized": norm,
+        "bytes_saved_pct": round((1 - norm["bytes_compressed"] / raw["bytes_compressed"]) * 100, 2)
+        if raw["bytes_compressed"] else None,
+        "speedup": round(raw["total_s"] / norm["total_s"], 3) if norm["total_s"] else None,
+        "accuracy_delta": round(norm["accuracy"] - raw["accuracy"], 2),
+    }
+
+STAGES = {
+    "classify": stage_classify,
+    "batch": stage_batch,
+    "core_build": stage_core_build,
+    "debug": stage_debug,
+    "core_create": stage_core_create,
+    "normalize": stage_normalize,
+}
+
+def _run_stage(name, cfg):
+    result = STAGES[name](cfg)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+def run_benchmark(cfg, stages):
+    """Каждый этап выполняется в отдельном процессе, чтобы пик RSS был его собственным."""
+    results = {}
+    for name in stages:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results[name] = executor.submit(_run_stage, name, cfg).result()
+        print(f"[BENCH] {name}: {json.dumps(results[name], ensure_ascii=False)}")
+    return results
+
+def main(argv=None, prog=None):
+    p = argparse.ArgumentParser(
+        prog=prog,
+        description="Воспроизводимый офлайн-бенчмарк классификации, сборки и отладки ядер"
+    )
+    p.add_argument("--articles", type=int, default=200,
+                   help="Общее число статей для классификации (по умолчанию %(default)s)")
+    p.add_argument("--bytes", type=int, default=4000,
+                   help="Байт в статье (по умолчанию %(default)s)")
+    p.add_argument("--categories", type=int, default=10,
+                   help="Число тем (по умолчанию %(default)s)")
+    p.add_argument("--alphabet", choices=["latin", "cyrillic"], default="latin",
+                   help="Алфавит синтетического текста (по умолчанию %(default)s)")
+    p.add_argument("--core-size", type=int, default=4,
+                   help="Статей в ядре (по умолчанию %(default)s)")
+    p.add_argument("--candidates", type=int, default=6,
+                   help="Кандидатов на тему для этапа debug (по умолчанию %(default)s)")
+    p.add_argument("--build-categories", type=int, default=2,
+                   help="Сколько тем собирать на этапе core_build (по умолчанию %(default)s)")
+    p.add_argument("--debug-categories", type=int, default=1,
+                   help="Сколько худших тем отлаживать на этапе debug (по умолчанию %(default)s)")
+    p.add_argument("--candidate-jobs", type=int, default=1,
+                   help="Процессов оценки кандидатов на этапе debug (по умолчанию %(default)s)")
+    p.add_argument("-b", "--backend", choices=sorted(b for b in BACKENDS if b != "7z"), default="zlib",
+                   help="Бэкенд сжатия в памяти (по умолчанию %(default)s)")
+    p.add_argument("-l", "--level", type=int, default=None,
+                   help="Уровень сжатия бэкенда")
+    p.add_argument("--threads", type=int, default=None,
+                   help="Потоков на статью в этапах classify и debug")
+    p.add_argument("-j", "--jobs", type=int, nargs="+", default=None,
+                   help="Числа процессов для этапа batch (по умолчанию 1, 2, 4, ... до числа ядер CPU)")
+    p.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES),
+                   help="Какие этапы запускать")
+    p.add_argument("--boilerplate", action="store_true",
+                   help="Добавить в статьи мусор извлечения из PDF: колонтитулы, переносы, "
+                        "лишние пробелы, лигатуры, список литературы")
+    normalize.add_arguments(p)
+    p.add_argument("--seed", type=int, default=1, help="Зерно генератора корпуса")
+    p.add_argument("--workdir", default=None,
+                   help="Папка для корпуса (по умолчанию временная, удаляется после запуска)")
+    p.add_argument("-o", "--output", default="benchmark.json",
+                   help="Куда записать результаты в JSON (по умолчанию %(default)s)")
+    args = p.parse_args(argv)
+
+    jobs = args.jobs
+    if not jobs:
+        cpus = os.cpu_count() or 1
+        jobs = [1]
+        while jobs[-1] * 2 <= cpus:
+            jobs.append(jobs[-1] * 2)
+        if jobs[-1] != cpus:
+            jobs.append(cpus)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="ccbench_")
+    try:
+        t0 = time.perf_counter()
+        generate_corpus(
+            workdir, args.articles, args.bytes, args.categories,
+            args.core_size, args.candidates, args.alphabet, args.seed, args.boilerplate
+        )
+        cfg = {
+            "workdir": workdir,
+            "backend": args.backend,
+            "level": args.level,
+            "threads": args.threads,
+            "jobs": jobs,
+            "core_size": args.core_size,
+            "build_categories": args.build_categories,
+            "debug_categories": args.debug_categories,
+            "candidate_jobs": args.candidate_jobs,
+            "normalize": args.normalize,
+            "max_bytes": args.max_bytes,
+        }
+        report = {
+            "config": {k: v for k, v in vars(args).items() if k not in ("workdir", "output")},
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "corpus_s": round(time.perf_counter() - t0, 4),
+            "stages": run_benchmark(cfg, args.stages),
+        }
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены в {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import logging
+
+from .batch import score_grid, score_pairs
+from .core_registry import CoreRegistry
+
+logger = logging.getLogger(__name__)
+
+def survivors(fast_diffs, top_k=None, margin=None):
+    """
+    Ядра, которые стоит пересчитать дорогим бэкендом: top_k лучших по
+    быстрому проходу и/или все, чей прирост не больше лучшего на долю margin.
+    """
+    ranked = sorted(fast_diffs.items(), key=lambda x: (x[1], x[0]))
+    if not ranked:
+        return []
+    keep = set()
+    if top_k:
+        keep.update(cat for cat, _ in ranked[:top_k])
+    if margin is not None:
+        limit = ranked[0][1] + abs(ranked[0][1]) * margin
+        keep.update(cat for cat, diff in ranked if diff <= limit)
+    if not keep:
+        keep.add(ranked[0][0])
+    return [cat for cat, _ in ranked if cat in keep]
+
+def best(diffs):
+    return min(diffs.items(), key=lambda x: (x[1], x[0]))[0] if diffs else None
+
+class CascadeStats:
+    def __init__(self):
+        self.articles = 0
+        self.pairs = 0
+        self.rescored = 0
+        self.audited = 0
+        self.disagreements = 0
+        self.winner_dropped = 0
+
+    def record(self, n_cores, kept, diffs, full_diffs=None):
+        self.articles += 1
+        self.pairs += n_cores
+        self.rescored += len(kept)
+        if full_diffs is not None:
+            self.audited += 1
+            exhaustive = best(full_diffs)
+            if best(diffs) != exhaustive:
+                self.disagreements += 1
+            if exhaustive is not None and exhaustive not in kept:
+                self.winner_dropped += 1
+
+    def report(self):
+        if not self.articles:
+            return
+        share = self.rescored / self.pairs * 100 if self.pairs else 0.0
+        logger.info(
+            f"Каскад: статей {self.articles}, дорогим бэкендом пересчитано "
+            f"{self.rescored} из {self.pairs} пар ({share:.1f}%)"
+        )
+        if self.audited:
+            rate = self.disagreements / self.audited * 100
+            logger.info(
+                f"Каскад: ответ отличается от полного перебора в {self.disagreements} "
+                f"из {self.audited} статей ({rate:.2f}%), победитель полного перебора "
+                f"отсеян быстрым проходом в {self.winner_dropped}"
+            )
+
+class Cascade:
+    """
+    Каскадная оценка: быстрый бэкенд ранжирует все ядра, дорогой
+    пересчитывает только выживших (см. survivors). С audit=True
+    дополнительно считается полный перебор дорогим бэкендом, чтобы
+    оценить, как часто ответ каскада отличается от него.
+    """
+
+    def __init__(self, fast_backend, top_k=5, margin=None, audit=False):
+        self.fast_backend = fast_backend
+        self.top_k = top_k
+        self.margin = margin
+        self.audit = audit
+        self.stats = CascadeStats()
+
+    def scorer(self, registry):
+        return CascadeScorer(self, CoreRegistry(self.fast_backend, registry.cache), registry)
+
+    def grid(self, text_files, zip_cores, backend, jobs=None, chunksize=None, cache=None):
+        fast = score_grid(text_files, zip_cores, self.fast_backend, jobs, chunksize, cache)
+        kept = [survivors(d, self.top_k, self.margin) for d in fast]
+        if self.audit:
+            full = score_grid(text_files, zip_cores, backend, jobs, chunksize, cache)
+            grid = [{c: f[c] for c in k if c in f} for f, k in zip(full, kept)]
+        else:
+            full = [None] * len(text_files)
+            pairs = [
+                (idx, text_file, category)
+                for idx, (text_file, k) in enumerate(zip(text_files, kept))
+                for category in k
+            ]
+            grid = score_pairs(pairs, len(text_files), zip_cores, backend, jobs, chunksize, cache)
+        for k, diffs, f in zip(kept, grid, full):
+            self.stats.record(len(zip_cores), k, diffs, f)
+        return grid
+
+class CascadeScorer:
+    """Каскад для одной статьи; интерфейс diffs() как у CoreRegistry."""
+
+    def __init__(self, cascade, fast_registry, registry):
+        self.cascade = cascade
+        self.fast_registry = fast_registry
+        self.registry = registry
+
+    def diffs(self, zip_cores, text_file, max_workers=None):
+        c = self.cascade
+        fast = self.fast_registry.diffs(zip_cores, text_file, max_workers)
+        kept = survivors(fast, c.top_k, c.margin)
+        if c.audit:
+            full = self.registry.diffs(zip_cores, text_file, max_workers)
+            diffs = {cat: full[cat] for cat in kept if cat in full}
+        else:
+            full = None
+            diffs = self.registry.diffs(
+                {cat: zip_cores[cat] for cat in kept}, text_file, max_workers
+            )
+        c.stats.record(len(zip_cores), kept, diffs, full)
+        return diffs
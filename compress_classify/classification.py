@@ -0,0 +1,297 @@
+import os
+import logging
+import sys
+import argparse
+
+from .backends import BACKENDS, SevenZipBackend, find_7z, make_backend
+from .core_registry import CoreRegistry, list_cores, shared_registry
+from . import metrics, normalize
+from .metrics import METRICS
+from .result_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, open_cache
+
+logger = logging.getLogger(__name__)
+
+def report_diffs(text_file, diffs, results=None, label=None):
+    if not diffs:
+        logger.warning(f"Нет результатов для {text_file}")
+        if results is not None:
+            results.write(text_file, None, {}, label)
+        return None
+
+    predicted, best = min(diffs.items(), key=lambda x: (x[1], x[0]))
+    with METRICS.timer("results"):
+        logger.debug(f"'{os.path.basename(text_file)}': {predicted} (+{best} байт)")
+        if results is not None:
+            results.write(text_file, predicted, diffs, label)
+    return predicted
+
+def classify_text_with_zips(zip_tool_path, zip_cores, text_file, max_workers=None, registry=None,
+                            results=None):
+    if registry is None:
+        registry = shared_registry(zip_tool=zip_tool_path)
+    diffs = registry.diffs(zip_cores, text_file, max_workers)
+    return report_diffs(text_file, diffs, results)
+
+def collect_texts(root_folder):
+    texts = []
+    for true_cat in os.listdir(root_folder):
+        cat_path = os.path.join(root_folder, true_cat)
+        if not os.path.isdir(cat_path):
+            continue
+        for fname in os.listdir(cat_path):
+            if fname.endswith(".txt"):
+                texts.append((true_cat, os.path.join(cat_path, fname)))
+    return texts
+
+def classify_texts(root_folder, cores_folder, zip_tool_path, backend=None, jobs=None, chunksize=None,
+                   cache=None, cascade=None, stream=None, matrix_path=None, results_path=None,
+                   normalizer=None):
+    if backend is None:
+        backend = SevenZipBackend(zip_tool_path)
+    with METRICS.timer("scan"):
+        zip_cores = list_cores(cores_folder)
+        texts = collect_texts(root_folder)
+    METRICS.count("articles", len(texts))
+    # Сжимаются нормализованные копии, в результатах остаются исходные пути.
+    sources = [normalize.source_path(normalizer, t) for _, t in texts]
+    registry = None
+
+    if jobs:
+        from .batch import score_grid
+        grid_fn = cascade.grid if cascade else score_grid
+        grid = grid_fn(sources, zip_cores, backend, jobs, chunksize, cache)
+    else:
+        registry = CoreRegistry(backend, cache)
+        if cascade:
+            registry = cascade.scorer(registry)
+        elif stream is not None:
+            from .streaming import StreamingScorer
+            registry = StreamingScorer(registry, **stream)
+        grid = (registry.diffs(zip_cores, t) for t in sources)
+
+    rows = []
+    predictions = []
+    results = None
+    if results_path:
+        from .result_writer import ResultWriter
+        results = ResultWriter(results_path, zip_cores)
+    try:
+        for (true_cat, text_file), diffs in zip(texts, grid):
+            predictions.append(report_diffs(text_file, diffs, results, true_cat))
+            if matrix_path:
+                rows.append(diffs)
+    finally:
+        if results is not None:
+            results.close()
+    if results is not None:
+        logger.info(f"Результаты по статьям ({results.written}) записаны: {results_path}")
+
+    total = 0
+    correct = 0
+    per_cat_total = {}
+    per_cat_correct = {}
+
+    for (true_cat, _), predicted in zip(texts, predictions):
+        per_cat_total.setdefault(true_cat, 0)
+        per_cat_total[true_cat] += 1
+        total += 1
+
+        if predicted == true_cat:
+            correct += 1
+            per_cat_correct.setdefault(true_cat, 0)
+            per_cat_correct[true_cat] += 1
+
+    overall_acc = (correct / total * 100) if total else 0.0
+    logger.info(f"Всего файлов: {total}, Правильно: {correct}, Общая точность: {overall_acc:.2f}%")
+
+    for cat, cnt in per_cat_total.items():
+        acc = per_cat_correct.get(cat, 0) / cnt * 100
+        logger.info(f"    {cat}: {acc:.2f}%")
+
+    if matrix_path:
+        from .delta_matrix import DeltaMatrix
+        DeltaMatrix.from_rows(texts, rows, zip_cores).save(matrix_path)
+        logger.info(f"Матрица приростов сохранена: {matrix_path}")
+
+    if cascade:
+        cascade.stats.report()
+    elif stream is not None and registry is not None:
+        registry.report()
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Классификация текстов с помощью сжатия в .7z по категориям"
+    )
+    parser.add_argument(
+        "-r", "--root",
+        required=True,
+        help="Путь к корневой папке с подкатегориями текстов"
+    )
+    parser.add_argument(
+        "-c", "--cores",
+        required=True,
+        help="Путь к папке с .7z-архивами ядер"
+    )
+    parser.add_argument(
+        "-b", "--backend",
+        choices=sorted(BACKENDS),
+        default="7z",
+        help="Способ сжатия: внешний 7z или сжатие в памяти (lzma, bz2, zlib)"
+    )
+    parser.add_argument(
+        "-l", "--level",
+        type=int,
+        default=None,
+        help="Уровень сжатия бэкенда (по умолчанию — уровень бэкенда)"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Пакетный режим: вся сетка статьи×ядра на пуле из N процессов"
+    )
+    parser.add_argument(
+        "--chunk",
+        type=int,
+        default=None,
+        help="Пар статья×ядро в одной задаче пакетного режима (по умолчанию — число ядер)"
+    )
+    parser.add_argument(
+        "--cache",
+        default=DEFAULT_CACHE_PATH,
+        help="Файл SQLite-кеша приростов (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Не использовать кеш приростов"
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Очистить кеш приростов перед запуском"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Максимум записей в кеше (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "--cascade-top-k",
+        type=int,
+        default=None,
+        help="Каскад: пересчитывать основным бэкендом только K лучших ядер быстрого прохода"
+    )
+    parser.add_argument(
+        "--cascade-margin",
+        type=float,
+        default=None,
+        help="Каскад: пересчитывать также ядра, чей быстрый прирост не больше лучшего на эту долю"
+    )
+    parser.add_argument(
+        "--cascade-backend",
+        choices=sorted(BACKENDS),
+        default="zlib",
+        help="Быстрый бэкенд каскада (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "--cascade-level",
+        type=int,
+        default=1,
+        help="Уровень сжатия быстрого бэкенда (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "--cascade-audit",
+        action="store_true",
+        help="Каскад: дополнительно считать полный перебор и сообщить, как часто ответ отличается"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Потоковая оценка с ранней остановкой для длинных статей (только -b zlib)"
+    )
+    parser.add_argument(
+        "--stream-chunk",
+        type=int,
+        default=16384,
+        help="Размер куска потоковой оценки в байтах (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "--stream-budget",
+        type=int,
+        default=None,
+        help="Максимум байт статьи для потоковой оценки"
+    )
+    parser.add_argument(
+        "--stream-rate",
+        type=float,
+        default=0.05,
+        help="На сколько байт на байт остатка отставшее ядро ещё может догнать лидера (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "-m", "--matrix",
+        default=None,
+        help="Сохранить матрицу приростов статьи×ядра в .npz для последующего анализа"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=None,
+        help="Записать приросты и предсказания по статьям в JSONL (или CSV, если файл .csv)"
+    )
+    normalize.add_arguments(parser)
+    metrics.add_arguments(parser)
+    args = parser.parse_args(argv)
+    normalizer = normalize.from_args(parser, args)
+    if args.profile:
+        metrics.enable(args.profile, args.profile_format)
+
+    if args.cascade_audit and not args.cascade_top_k and args.cascade_margin is None:
+        parser.error("--cascade-audit требует --cascade-top-k или --cascade-margin")
+    if args.stream:
+        if args.backend != "zlib":
+            parser.error("--stream требует -b zlib")
+        if args.jobs or args.cascade_top_k or args.cascade_margin is not None:
+            parser.error("--stream не сочетается с -j и каскадом")
+
+    logging.basicConfig(
+        filename='classification2.log',
+        level=logging.INFO,
+        format='%(asctime)s %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    ROOT_FOLDER = args.root
+    CORES_FOLDER = args.cores
+    ZIP_TOOL = find_7z()
+
+    if not os.path.isdir(ROOT_FOLDER):
+        sys.exit(f"Root-folder не найден: {ROOT_FOLDER}")
+    if not os.path.isdir(CORES_FOLDER):
+        sys.exit(f"Cores-folder не найден: {CORES_FOLDER}")
+    if not os.path.isfile(ZIP_TOOL):
+        sys.exit(f"Не найден 7z по пути: {ZIP_TOOL}")
+
+    backend = make_backend(args.backend, ZIP_TOOL, args.level)
+    cascade = None
+    if args.cascade_top_k or args.cascade_margin is not None:
+        from .cascade import Cascade
+        cascade = Cascade(
+            make_backend(args.cascade_backend, ZIP_TOOL, args.cascade_level),
+            args.cascade_top_k, args.cascade_margin, args.cascade_audit
+        )
+    stream = None
+    if args.stream:
+        stream = {"chunk_size": args.stream_chunk, "budget": args.stream_budget, "rate": args.stream_rate}
+    cache = None if args.no_cache else open_cache(args.cache, args.cache_size, args.clear_cache)
+    try:
+        classify_texts(ROOT_FOLDER, CORES_FOLDER, ZIP_TOOL, backend, args.jobs, args.chunk, cache, cascade,
+                       stream, args.matrix, args.output, normalizer)
+    finally:
+        if cache is not None:
+            if not args.jobs:
+                logger.info(f"Кеш приростов: попаданий {cache.hits}, промахов {cache.misses}")
+            cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+import sys
+import argparse
+import logging
+
+from .backends import BACKENDS, find_7z, make_backend
+from .core_registry import list_cores, shared_registry
+from . import metrics, normalize
+
+def classify_text_with_zips(zip_tool, zip_cores, text_path, max_workers=None, registry=None):
+    if registry is None:
+        registry = shared_registry(zip_tool=zip_tool)
+    diffs = registry.diffs(zip_cores, text_path, max_workers)
+
+    if not diffs:
+        return None
+    return min(diffs.items(), key=lambda x: (x[1], x[0]))[0]
+
+def main(argv=None, prog=None):
+    p = argparse.ArgumentParser(
+        prog=prog,
+        description="Классификация одного .txt файла по .7z-ядрам"
+    )
+    p.add_argument("-c", "--cores",   required=True, nargs="+",
+                   help="Папка с .7z-архивами ядер (имя архива = категория); "
+                        "в режиме --serve можно указать несколько")
+    p.add_argument("-i", "--input",
+                   help="Текстовый файл для классификации (.txt)")
+    p.add_argument("-w", "--workers", type=int, default=None,
+                   help="(опционально) число потоков")
+    p.add_argument("-b", "--backend", choices=sorted(BACKENDS), default="7z",
+                   help="Способ сжатия: внешний 7z или в памяти (lzma, bz2, zlib)")
+    p.add_argument("-l", "--level",   type=int, default=None,
+                   help="(опционально) уровень сжатия бэкенда")
+    p.add_argument("--serve", action="store_true",
+                   help="Запустить резидентный сервер классификации")
+    p.add_argument("--host", default="127.0.0.1",
+                   help="Адрес сервера для --serve (по умолчанию %(default)s)")
+    p.add_argument("--port", type=int, default=8765,
+                   help="Порт сервера для --serve (по умолчанию %(default)s)")
+    p.add_argument("-s", "--server", default=None,
+                   help="URL запущенного сервера, например http://127.0.0.1:8765")
+    p.add_argument("--stream", action="store_true",
+                   help="Потоковая оценка с ранней остановкой (только -b zlib)")
+    p.add_argument("--stream-budget", type=int, default=None,
+                   help="(опционально) максимум байт статьи для потоковой оценки")
+    normalize.add_arguments(p)
+    metrics.add_arguments(p)
+    args = p.parse_args(argv)
+    normalizer = normalize.from_args(p, args)
+    if args.profile:
+        metrics.enable(args.profile, args.profile_format)
+
+    workers = args.workers
+
+    if args.stream and args.backend != "zlib":
+        p.error("--stream требует -b zlib")
+    if not args.serve:
+        if len(args.cores) != 1:
+            p.error("без --serve нужна ровно одна папка ядер")
+        if not args.input:
+            p.error("нужен -i/--input")
+    cores_folder = args.cores[0]
+    text_file    = args.input
+
+    if args.server:
+        if not os.path.isfile(text_file) or not text_file.lower().endswith(".txt"):
+            sys.exit(f"ERROR: input должен быть .txt и существовать: {text_file}")
+        text_file = normalize.source_path(normalizer, text_file)
+        try:
+            from .server import classify_remote
+            predicted = classify_remote(args.server, cores_folder, text_file)
+        except RuntimeError as e:
+            sys.exit(f"ERROR: {e}")
+        if predicted:
+            print(predicted)
+            sys.exit(0)
+        else:
+            print("Не удалось определить тему.")
+            sys.exit(2)
+
+    for folder in args.cores:
+        if not os.path.isdir(folder):
+            sys.exit(f"ERROR: cores-folder не найден: {folder}")
+    if not args.serve:
+        if not os.path.isfile(text_file) or not text_file.lower().endswith(".txt"):
+            sys.exit(f"ERROR: input должен быть .txt и существовать: {text_file}")
+
+    zip_tool = find_7z()
+    if not os.path.isfile(zip_tool):
+        sys.exit(f"ERROR: не найден 7z по пути: {zip_tool}")
+
+    for folder in args.cores:
+        if not list_cores(folder):
+            sys.exit(f"ERROR: в {folder} нет .7z-файлов")
+
+    if args.serve:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
+        backend = make_backend(args.backend, zip_tool, args.level)
+        from .server import ClassificationService, serve
+        serve(ClassificationService(args.cores, backend, workers), args.host, args.port)
+        sys.exit(0)
+
+    zip_cores = list_cores(cores_folder)
+    registry = shared_registry(args.backend, args.level)
+    if args.stream:
+        from .streaming import StreamingScorer
+        registry = StreamingScorer(registry, budget=args.stream_budget)
+    text_file = normalize.source_path(normalizer, text_file)
+    predicted = classify_text_with_zips(zip_tool, zip_cores, text_file, workers, registry)
+    if predicted:
+        print(predicted)
+        sys.exit(0)
+    else:
+        print("Не удалось определить тему.")
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import sys
+import importlib
+
+# Подкоманда: (модуль пакета, описание). Модуль импортируется только для
+# выбранной подкоманды, поэтому numpy, PyPDF2, requests и bs4 не грузятся
+# там, где они не нужны.
+COMMANDS = {
+    "classify": ("classification", "классификация папки статей по ядрам (Classification.py)"),
+    "classify-one": ("classify_one", "одна статья, сервер и клиент (ClassificationOneArticless.py)"),
+    "debug-cores": ("debug_cores", "отладка худшего ядра (DebugCores.py)"),
+    "update-core": ("update_core", "сборка ядер по матрице сжатия (updateCore.py)"),
+    "create-cores": ("core_creator", "ядра из случайных статей (CoreCreater.py)"),
+    "split": ("sup", "перенос части статей в отдельную папку (Sup.py)"),
+    "totxt": ("totxt", "PDF → TXT для папки (totxt.py)"),
+    "totxt-one": ("totxt_one", "PDF → TXT для одного файла (totxtOneArticless.py)"),
+    "download-arxiv": ("downloader_arxiv", "скачать статьи с arXiv (DownloaderArxiv.py)"),
+    "download-cyberleninka": ("downloader_cyberleninka", "скачать статьи с CyberLeninka (DownloaderCyberLeninka.py)"),
+    "benchmark": ("benchmark", "офлайн-бенчмарк (benchmark.py)"),
+    "install": ("install", "установить зависимости (Install.py)"),
+}
+
+PROG = "python -m compress_classify"
+
+def usage():
+    width = max(len(name) for name in COMMANDS)
+    lines = [f"usage: {PROG} <команда> [аргументы]", "", "команды:"]
+    for name, (_, help_text) in COMMANDS.items():
+        lines.append(f"  {name.ljust(width)}  {help_text}")
+    lines.append("")
+    lines.append(f"Справка по команде: {PROG} <команда> -h")
+    return "\n".join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(usage(), file=sys.stderr)
+        print(f"\nНеизвестная команда: {command}", file=sys.stderr)
+        return 2
+    module = importlib.import_module(f".{COMMANDS[command][0]}", __package__)
+    return module.main(rest, prog=f"{PROG} {command}")
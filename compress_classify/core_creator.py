@@ -0,0 +1,101 @@
+import os
+import sys
+import shutil
+import subprocess
+import argparse
+from random import sample
+
+from .backends import find_7z
+from . import normalize
+
+def move_and_archive(source_dir, output_dir, files_per_category, normalizer=None):
+    zip_tool = find_7z()
+    os.makedirs(output_dir, exist_ok=True)
+    sources_dir = os.path.normpath(output_dir) + "_sources"
+
+    for category in os.listdir(source_dir):
+        cat_path = os.path.join(source_dir, category)
+        if not os.path.isdir(cat_path):
+            continue
+
+        files = [f for f in os.listdir(cat_path) if os.path.isfile(os.path.join(cat_path, f))]
+        if not files:
+            print(f"Skipping empty category: {category}")
+            continue
+
+        num_to_move = min(files_per_category, len(files))
+        to_move = sample(files, num_to_move)
+
+        # С normalizer статьи ядра остаются на диске, поэтому лежат не в папке
+        # ядер (list_cores принял бы их за ядро), а рядом: <output_dir>_sources.
+        if normalizer is not None:
+            staging_folder = os.path.join(sources_dir, category)
+        else:
+            staging_folder = os.path.join(output_dir, category)
+        os.makedirs(staging_folder, exist_ok=True)
+
+        for fname in to_move:
+            src = os.path.join(cat_path, fname)
+            dst = os.path.join(staging_folder, fname)
+            shutil.move(src, dst)
+        normalize.prune(cat_path)
+        print(f"Moved {num_to_move} files from '{category}' to staging.")
+
+        # С normalizer в архив идут нормализованные копии из staging/.norm-*,
+        # а сами статьи остаются в staging без изменений.
+        pack_folder = staging_folder
+        if normalizer is not None:
+            copies = [normalizer.path(os.path.join(staging_folder, fname)) for fname in to_move]
+            pack_folder = os.path.dirname(copies[0])
+
+        archive_path = os.path.join(output_dir, f"{category}.7z")
+        print(f"Archiving '{staging_folder}' -> '{archive_path}'...")
+        try:
+            subprocess.run(
+                [zip_tool, "a", "-t7z", archive_path, os.path.join(pack_folder, "*")],
+                check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            print(f"Archive created: {archive_path}")
+        except subprocess.CalledProcessError as e:
+            err = e.stderr.decode(errors="ignore").strip()
+            print(f"Error archiving '{category}': {err}")
+            continue
+
+        if normalizer is not None:
+            shutil.rmtree(pack_folder, ignore_errors=True)
+            print(f"Original articles kept in: {staging_folder}")
+            continue
+        try:
+            shutil.rmtree(staging_folder)
+            print(f"Removed staging folder: {staging_folder}")
+        except Exception as ex:
+            print(f"Could not remove staging folder '{staging_folder}': {ex}")
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="..."
+    )
+    parser.add_argument(
+        '-n', '--number', type=int, required=True,
+        help="..."
+    )
+    parser.add_argument(
+        '-s', '--source', type=str, required=True,
+        help="..."
+    )
+    parser.add_argument(
+        '-o', '--output', type=str, required=True,
+        help="..."
+    )
+    normalize.add_arguments(parser)
+    args = parser.parse_args(argv)
+    normalizer = normalize.from_args(parser, args)
+
+    if not os.path.isdir(args.source):
+        sys.exit(f"...")
+
+    move_and_archive(args.source, args.output, args.number, normalizer)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .backends import find_7z, make_backend, read_article
+from .metrics import METRICS
+from .result_cache import hash_bytes, hash_file
+
+logger = logging.getLogger(__name__)
+
+_listings = {}
+
+def list_cores(cores_folder):
+    """
+    {категория: путь к .7z} для папки ядер. Список запоминается и читается
+    заново, только если папка изменилась (добавили, удалили или заменили ядро).
+    """
+    stamp = os.stat(cores_folder).st_mtime_ns
+    entry = _listings.get(cores_folder)
+    if entry is None or entry[0] != stamp:
+        METRICS.count("core_scans")
+        entry = (stamp, {
+            os.path.splitext(f)[0]: os.path.join(cores_folder, f)
+            for f in os.listdir(cores_folder) if f.lower().endswith(".7z")
+        })
+        _listings[cores_folder] = entry
+    return dict(entry[1])
+
+class CoreRegistry:
+    """
+    Прогретые состояния ядер для одного бэкенда. Каждое ядро готовится
+    (распаковка, сжатие текста ядра) один раз; при изменении файла ядра
+    состояние готовится заново. С кешем результатов (ResultCache) пары
+    статья×ядро, уже посчитанные для того же содержимого, не сжимаются,
+    а ядро готовится только при первом промахе кеша.
+    """
+
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache
+        self._primed = {}
+        self._hashes = {}
+        self._prime_locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stamp(core_path):
+        st = os.stat(core_path)
+        return st.st_mtime_ns, st.st_size
+
+    def primed(self, core_path):
+        stamp = self._stamp(core_path)
+        entry = self._primed.get(core_path)
+        if entry is None or entry[0] != stamp:
+            # Несколько потоков могут одновременно сжимать статьи с одним
+            # новым ядром: готовит его только первый.
+            with self._lock:
+                prime_lock = self._prime_locks.setdefault(core_path, threading.Lock())
+            with prime_lock:
+                entry = self._primed.get(core_path)
+                if entry is None or entry[0] != stamp:
+                    with METRICS.timer("prime"):
+                        entry = (stamp, self.backend.prime(core_path))
+                    with self._lock:
+                        self._primed[core_path] = entry
+        return entry[1]
+
+    def core_hash(self, core_path):
+        stamp = self._stamp(core_path)
+        entry = self._hashes.get(core_path)
+        if entry is None or entry[0] != stamp:
+            with METRICS.timer("hash_core"):
+                entry = (stamp, hash_file(core_path))
+            with self._lock:
+                self._hashes[core_path] = entry
+        return entry[1]
+
+    def forget(self, core_path):
+        with self._lock:
+            self._primed.pop(core_path, None)
+            self._hashes.pop(core_path, None)
+            self._prime_locks.pop(core_path, None)
+
+    def diff(self, core_path, text_file, data=None, text_hash=None):
+        try:
+            if self.cache is not None and text_hash is not None:
+                key = (text_hash, self.core_hash(core_path), self.backend.name, self.backend.level)
+                with METRICS.timer("cache_lookup"):
+                    diff = self.cache.get(*key)
+                if diff is None:
+                    METRICS.count("cache_misses")
+                    diff = self.backend.score(self.primed(core_path), text_file, data)
+                    with METRICS.timer("cache_store"):
+                        self.cache.put(*key, diff)
+                else:
+                    METRICS.count("cache_hits")
+                return diff
+            return self.backend.score(self.primed(core_path), text_file, data)
+        except Exception as e:
+            logger.error(f"Ошибка при сжатии {text_file} с ядром {core_path}: {e}")
+            return None
+
+    def read_text(self, text_file):
+        """Прочитать статью, если она нужна бэкенду или кешу: (data, text_hash)."""
+        if not self.backend.in_memory and self.cache is None:
+            return None, None
+        data = read_article(text_file)
+        return data, hash_bytes(data) if self.cache is not None else None
+
+    def diffs(self, zip_cores, text_file, max_workers=None):
+        data, text_hash = self.read_text(text_file)
+
+        diffs = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_cat = {
+                executor.submit(self.diff, core, text_file, data, text_hash): cat
+                for cat, core in zip_cores.items()
+            }
+            for future in as_completed(future_to_cat):
+                diff = future.result()
+                if diff is not None:
+                    diffs[future_to_cat[future]] = diff
+        return diffs
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+def shared_registry(backend="7z", level=None, cache=None, zip_tool=None):
+    """
+    Общий на процесс реестр ядер для бэкенда, уровня и пути к 7z:
+    классификация, отладка ядер и сервер, запущенные в одном процессе,
+    готовят каждое ядро один раз.
+    """
+    zip_tool = zip_tool or find_7z()
+    key = (backend, level, cache.path if cache is not None else None, zip_tool)
+    with _shared_lock:
+        registry = _shared.get(key)
+        if registry is None:
+            registry = CoreRegistry(make_backend(backend, zip_tool, level), cache)
+            _shared[key] = registry
+    return registry
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
+from collections.abc import Mapping
+
+from .metrics import METRICS
+from .result_cache import hash_file
+
+DEFAULT_STORE_DIR = "core_store"
+DEFAULT_MAX_AGE_DAYS = 7
+
+logger = logging.getLogger(__name__)
+
+class CoreStore:
+    """
+    Кеш распакованных ядер на диске, адресуемый по содержимому: папка
+    <хеш архива> со списком файлов архива и уже извлечёнными файлами.
+    Список читается один раз (7z l), файлы извлекаются по одному при первом
+    обращении. Одно и то же ядро не распаковывается повторно ни в этом, ни
+    в следующих запусках, а изменённый архив получает новую папку.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, zip_tool=None):
+        self.root = root
+        self.zip_tool = zip_tool
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _lock(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _write_json(self, path, data):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def members(self, archive):
+        """(хеш архива, [файлы .txt в архиве]); список берётся из кеша."""
+        digest = hash_file(archive)
+        entry = os.path.join(self.root, digest)
+        listing = os.path.join(entry, "members.json")
+        with self._lock(digest):
+            if os.path.exists(listing):
+                with open(listing, "r", encoding="utf-8") as f:
+                    names = json.load(f)
+                METRICS.count("store_hits")
+            else:
+                os.makedirs(entry, exist_ok=True)
+                names = self._list(archive)
+                self._write_json(listing, names)
+                METRICS.count("store_misses")
+            os.utime(entry)
+        return digest, names
+
+    def _list(self, archive):
+        with METRICS.timer("store_list"):
+            out = subprocess.run(
+                [self.zip_tool, "l", "-slt", archive],
+                check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            ).stdout.decode("utf-8", errors="replace")
+        METRICS.count("spawns")
+        # В выводе 7z свойства самого архива отделены строкой из дефисов.
+        if "\n----------" in out:
+            out = out.split("\n----------", 1)[1]
+        names = []
+        for line in out.splitlines():
+            if line.startswith("Path = "):
+                name = line[len("Path = "):].strip()
+                if name.endswith(".txt"):
+                    names.append(name.replace("\\", "/"))
+        return sorted(names)
+
+    def path(self, digest, archive, member):
+        """Путь к извлечённому файлу member; при первом обращении он извлекается из archive."""
+        target = os.path.join(self.root, digest, "files", *member.split("/"))
+        if os.path.exists(target):
+            return target
+        with self._lock((digest, member)):
+            if os.path.exists(target):
+                return target
+            if hash_file(archive) != digest:
+                raise RuntimeError(f"Ядро {archive} изменилось после чтения списка файлов")
+            tmpdir = tempfile.mkdtemp(prefix="x_", dir=os.path.join(self.root, digest))
+            try:
+                with METRICS.timer("store_extract"):
+                    subprocess.run(
+                        [self.zip_tool, "x", archive, f"-o{tmpdir}", member, "-y"],
+                        check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                    )
+                METRICS.count("spawns")
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(os.path.join(tmpdir, *member.split("/")), target)
+            finally:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+        return target
+
+    def stub_pool(self, cores_folder):
+        return StubPool(self, cores_folder)
+
+    def gc(self, keep=(), max_age_days=DEFAULT_MAX_AGE_DAYS):
+        """
+        Удалить записи, которых нет в keep и которые не использовались
+        дольше max_age_days дней. Возвращает число удалённых записей.
+        """
+        keep = set(keep)
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            if name in keep or not os.path.isdir(entry):
+                continue
+            if os.path.getmtime(entry) < cutoff:
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+        if removed:
+            logger.info(f"Кеш ядер {self.root}: удалено устаревших записей {removed}")
+        return removed
+
+class StubPool(Mapping):
+    """
+    Статьи всех ядер папки: {«ядро/путь в архиве»: путь к файлу}. Ключи
+    берутся из списков архивов, файл извлекается только при обращении к нему.
+    """
+
+    def __init__(self, store, cores_folder):
+        self.store = store
+        self._members = {}
+        self.digests = set()
+        for arc in sorted(os.listdir(cores_folder)):
+            if not arc.endswith(".7z"):
+                continue
+            archive = os.path.join(cores_folder, arc)
+            digest, names = store.members(archive)
+            self.digests.add(digest)
+            core_name = os.path.splitext(arc)[0]
+            for name in names:
+                self._members[f"{core_name}/{name}"] = (digest, archive, name)
+
+    def __getitem__(self, key):
+        digest, archive, name = self._members[key]
+        return self.store.path(digest, archive, name)
+
+    def __contains__(self, key):
+        return key in self._members
+
+    def __iter__(self):
+        return iter(self._members)
+
+    def __len__(self):
+        return len(self._members)
@@ -0,0 +1,667 @@
+import os
+import math
+import subprocess
+import shutil
+import logging
+import tempfile
+import random
+import re
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from .backends import BACKENDS, find_7z
+from .classification import report_diffs
+from .core_registry import CoreRegistry, list_cores, shared_registry
+from .core_store import DEFAULT_MAX_AGE_DAYS, DEFAULT_STORE_DIR, CoreStore
+from . import metrics, normalize
+from .metrics import METRICS
+from .result_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, open_cache
+
+ROOT_FOLDER         = None
+CORES_FOLDER        = None
+TEST_FOLDER         = None
+MAX_DEBUG_ARTICLES  = 5
+MAX_WORKERS         = 4
+CANDIDATE_JOBS      = 1
+SEED                = None
+ZIP_TOOL            = find_7z()
+CACHE               = None
+REGISTRY            = None
+CANDIDATE_REGISTRY  = None
+STORE               = None
+STORE_MAX_AGE       = DEFAULT_MAX_AGE_DAYS
+NORMALIZER          = None
+
+logger = logging.getLogger(__name__)
+
+def build_parser(prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Скрипт отладки ядер классификации"
+    )
+    parser.add_argument(
+        "--root-folder", "-r",
+        required=True,
+        help="Путь к корневой папке с тестовыми текстами"
+    )
+    parser.add_argument(
+        "--cores-folder", "-c",
+        required=True,
+        help="Путь к папке с ядрами в .7z"
+    )
+    parser.add_argument(
+        "--test-folder", "-t",
+        required=True,
+        help="Путь к папке с кандидатами для отладки"
+    )
+    parser.add_argument(
+        "--max-debug-articles", "-n",
+        type=int,
+        default=5,
+        help="Максимальное число статей в ядре при отладке"
+    )
+    parser.add_argument(
+        "--max-workers", "-w",
+        type=int,
+        default=4,
+        help="Число потоков при классификации"
+    )
+    parser.add_argument(
+        "--candidate-jobs",
+        type=int,
+        default=1,
+        help="Число процессов для параллельной оценки кандидатов"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed выбора stub’ов (по умолчанию случайный; сохраняется в чекпоинте)"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help="Отладить все ядра с точностью ниже порога, %%"
+    )
+    parser.add_argument(
+        "--bottom",
+        type=int,
+        default=None,
+        help="Отладить N ядер с худшей точностью"
+    )
+    parser.add_argument(
+        "--category-jobs",
+        type=int,
+        default=1,
+        help="Число ядер, отлаживаемых одновременно"
+    )
+    parser.add_argument(
+        "--backend", "-b",
+        choices=sorted(BACKENDS),
+        default="7z",
+        help="Способ сжатия: внешний 7z или сжатие в памяти (lzma, bz2, zlib)"
+    )
+    parser.add_argument(
+        "--level", "-l",
+        type=int,
+        default=None,
+        help="Уровень сжатия бэкенда"
+    )
+    parser.add_argument(
+        "--matrix", "-m",
+        default=None,
+        help="Матрица приростов (.npz из Classification.py -m с теми же ядрами и бэкендом): "
+             "базовая точность и приросты по неизменным ядрам без повторного сжатия"
+    )
+    parser.add_argument(
+        "--cache",
+        default=DEFAULT_CACHE_PATH,
+        help="Файл SQLite-кеша приростов"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Не использовать кеш приростов"
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Очистить кеш приростов перед запуском"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Максимум записей в кеше"
+    )
+    parser.add_argument(
+        "--stub-store",
+        default=DEFAULT_STORE_DIR,
+        help="Папка кеша распакованных ядер (stub’ов)"
+    )
+    parser.add_argument(
+        "--stub-store-max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE_DAYS,
+        help="Через сколько дней без использования удалять записи кеша ядер, которых нет в папке ядер"
+    )
+    normalize.add_arguments(parser)
+    metrics.add_arguments(parser)
+    return parser
+
+def configure(args, normalizer=None):
+    """Задать папки и параметры отладки и открыть общий реестр ядер."""
+    global ROOT_FOLDER, CORES_FOLDER, TEST_FOLDER, MAX_DEBUG_ARTICLES, MAX_WORKERS
+    global CANDIDATE_JOBS, SEED, CACHE, REGISTRY, CANDIDATE_REGISTRY, STORE, STORE_MAX_AGE, NORMALIZER
+    ROOT_FOLDER         = args.root_folder
+    CORES_FOLDER        = args.cores_folder
+    TEST_FOLDER         = args.test_folder
+    MAX_DEBUG_ARTICLES  = args.max_debug_articles
+    MAX_WORKERS         = args.max_workers
+    CANDIDATE_JOBS      = args.candidate_jobs
+    SEED                = args.seed
+    CACHE = None if args.no_cache else open_cache(args.cache, args.cache_size, args.clear_cache)
+    REGISTRY = shared_registry(args.backend, args.level, CACHE)
+    # Временные ядра-кандидаты не кешируются: ключ кеша — хеш свежесобранного
+    # архива, он не повторяется ни между кандидатами, ни между запусками.
+    CANDIDATE_REGISTRY = CoreRegistry(REGISTRY.backend)
+    STORE = CoreStore(args.stub_store, ZIP_TOOL)
+    STORE_MAX_AGE = args.stub_store_max_age
+    NORMALIZER = normalizer
+
+def compute_accuracy_per_category(root_folder, cores_folder, zip_tool, matrix_path=None,
+                                  baseline=None):
+    """
+    Точность по темам с текущими ядрами. Если передан словарь baseline, в нём
+    остаются приросты каждой статьи по всем ядрам — отладка нескольких ядер
+    берёт из него приросты по неизменным ядрам вместо повторного сжатия.
+    """
+    zip_cores = list_cores(cores_folder)
+    if matrix_path:
+        from .delta_matrix import DeltaMatrix
+        logger.info(f"Базовая точность по матрице приростов {matrix_path}")
+        matrix = DeltaMatrix.load(matrix_path)
+        if baseline is not None:
+            baseline_from_matrix(matrix, os.path.getmtime(matrix_path), zip_cores, root_folder, baseline)
+        return matrix.per_category_accuracy()
+    per_total, per_correct = {}, {}
+    for cat in os.listdir(root_folder):
+        path = os.path.join(root_folder, cat)
+        if not os.path.isdir(path):
+            continue
+        per_total[cat] = per_correct[cat] = 0
+        for fn in os.listdir(path):
+            if not fn.endswith('.txt'):
+                continue
+            text_file = os.path.join(path, fn)
+            source = normalize.source_path(NORMALIZER, text_file)
+            diffs = REGISTRY.diffs(zip_cores, source, MAX_WORKERS)
+            if baseline is not None:
+                baseline[text_file] = diffs
+            pred = report_diffs(text_file, diffs)
+            per_total[cat] += 1
+            if pred == cat:
+                per_correct[cat] += 1
+    return {
+        c: (per_correct[c] / per_total[c] * 100) if per_total[c] else 0
+        for c in per_total
+    }
+
+def baseline_from_matrix(matrix, stamp, zip_cores, root_folder, baseline):
+    """
+    Заполнить baseline из матрицы Classification -m: строки сопоставляются
+    со статьями root_folder по абсолютному пути, столбцы — с ядрами
+    zip_cores по имени. Ядра, изменённые после записи матрицы (stamp), и
+    отсутствующие в ней пары не берутся: их досчитает fixed_core_deltas.
+    """
+    cols = []
+    for j, cat in enumerate(matrix.categories):
+        cat = str(cat)
+        if cat in zip_cores and os.path.getmtime(zip_cores[cat]) <= stamp:
+            cols.append((j, cat))
+    stale = sorted(set(zip_cores) - {cat for _, cat in cols})
+    if stale:
+        logger.info(f"Приросты по ядрам {', '.join(stale)} в матрице нет или они устарели, они будут пересчитаны")
+    rows = {os.path.abspath(str(p)): i for i, p in enumerate(matrix.paths)}
+    for cat in os.listdir(root_folder):
+        path = os.path.join(root_folder, cat)
+        if not os.path.isdir(path):
+            continue
+        for fn in os.listdir(path):
+            text_file = os.path.join(path, fn)
+            i = rows.get(os.path.abspath(text_file))
+            if i is None or not fn.endswith('.txt'):
+                continue
+            baseline[text_file] = {
+                c: int(matrix.deltas[i, j]) for j, c in cols if not math.isnan(matrix.deltas[i, j])
+            }
+    logger.info(f"Из матрицы взяты приросты для {len(baseline)} статей")
+
+def create_7z_archive(output_archive, texts, zip_tool, category_name=None, normalizer=None):
+    """Архив ядра из texts; с normalizer в него кладутся нормализованные копии под теми же именами."""
+    texts = [normalize.source_path(normalizer, txt) for txt in texts]
+    output_archive = os.path.abspath(output_archive)
+    if os.path.exists(output_archive):
+        os.remove(output_archive)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if category_name:
+            workdir = os.path.join(tmpdir, category_name)
+            os.makedirs(workdir, exist_ok=True)
+            for txt in texts:
+                shutil.copy(txt, workdir)
+            subprocess.run(
+                [zip_tool, "a", output_archive, category_name],
+                cwd=tmpdir, check=True,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        else:
+            for txt in texts:
+                shutil.copy(txt, tmpdir)
+            subprocess.run(
+                [zip_tool, "a", output_archive, "."],
+                cwd=tmpdir, check=True,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+
+def fixed_core_deltas(zip_cores, category, root_folder, baseline=None):
+    """
+    Приросты статей темы category по всем ядрам, кроме отлаживаемого: между
+    кандидатами меняется только ядро category, поэтому остальные считаются
+    один раз (или берутся из baseline базового прохода).
+    Возвращает [(статья, данные, хеш, {категория: прирост})].
+    """
+    cat_dir = os.path.join(root_folder, category)
+    fixed_cores = {c: p for c, p in zip_cores.items() if c != category}
+    fixed = []
+    for fn in os.listdir(cat_dir):
+        if not fn.endswith('.txt'):
+            continue
+        text_file = os.path.join(cat_dir, fn)
+        source = normalize.source_path(NORMALIZER, text_file)
+        data, text_hash = REGISTRY.read_text(source)
+        known = baseline.get(text_file, {}) if baseline is not None else {}
+        diffs = {c: d for c, d in known.items() if c in fixed_cores}
+        # Пары, которых нет в baseline (например, в матрице -m), досчитываются.
+        missing = {c: p for c, p in fixed_cores.items() if c not in diffs}
+        if missing:
+            diffs.update(REGISTRY.diffs(missing, source, MAX_WORKERS))
+        fixed.append((source, data, text_hash, diffs))
+    return fixed
+
+def evaluate_category_accuracy(core_path, category, fixed):
+    """Точность по теме с ядром-кандидатом core_path: сжимается только оно."""
+    def predict(item):
+        text_file, data, text_hash, diffs = item
+        diff = CANDIDATE_REGISTRY.diff(core_path, text_file, data, text_hash)
+        if diff is not None:
+            diffs = dict(diffs, **{category: diff})
+        if not diffs:
+            return None
+        return min(diffs.items(), key=lambda x: (x[1], x[0]))[0]
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        preds = list(executor.map(predict, fixed))
+    correct = sum(pred == category for pred in preds)
+    return (correct / len(preds) * 100) if preds else 0
+
+_fixed = None
+_worker = False
+
+def _init_candidate_worker(fixed, backend, max_workers=None, profile=False, normalizer=None):
+    """
+    Рабочий процесс оценки кандидатов: свои реестр (без кеша, как и для
+    кандидатов в основном процессе) и метрики; бэкенд общий — имена его
+    временных файлов включают pid.
+    """
+    global CANDIDATE_REGISTRY, MAX_WORKERS, NORMALIZER, _fixed, _worker
+    METRICS.snapshot(reset=True)
+    METRICS.enabled = profile
+    CANDIDATE_REGISTRY = CoreRegistry(backend)
+    MAX_WORKERS = max_workers
+    NORMALIZER = normalizer
+    _fixed, _worker = fixed, True
+
+def _evaluate_candidate(task, fixed=None):
+    """
+    Собрать ядро (ядро + кандидат) в личной временной папке и оценить его.
+    В рабочем процессе приросты неизменных ядер берутся из _fixed.
+    """
+    txt, members, category = task
+    with tempfile.TemporaryDirectory(prefix='cand_') as workspace:
+        temp_archive = os.path.join(workspace, f"{category}.7z")
+        with METRICS.timer("build_candidate"):
+            create_7z_archive(temp_archive, members + [txt], ZIP_TOOL, category_name=category,
+                              normalizer=NORMALIZER)
+        METRICS.count("spawns")
+        with METRICS.timer("evaluate_candidate"):
+            acc = evaluate_category_accuracy(
+                temp_archive, category, fixed if fixed is not None else _fixed
+            )
+        METRICS.count("candidates")
+        CANDIDATE_REGISTRY.forget(temp_archive)
+    return acc, METRICS.snapshot(reset=True) if _worker and METRICS.enabled else None
+
+def load_stub_pool():
+    """
+    Статьи текущих ядер из кеша распакованных ядер: файлы извлекаются только
+    для выбранных stub’ов. Заодно из кеша удаляются устаревшие записи.
+    """
+    with METRICS.timer("stub_pool"):
+        pool = STORE.stub_pool(CORES_FOLDER)
+    STORE.gc(keep=pool.digests, max_age_days=STORE_MAX_AGE)
+    logger.info(f"Stub pool: {len(pool)} файлов")
+    return pool
+
+def checkpoint_path(category):
+    return f"checkpoint_{category}.json"
+
+def save_checkpoint(path, state):
+    """Записать чекпоинт атомарно: во временный файл, fsync, затем замена."""
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+class CandidateLog:
+    """
+    Журнал оценок кандидатов checkpoint_<тема>.jsonl: строка JSON на каждую
+    оценку (итерация, состав ядра, кандидат, точность), дописывается с fsync.
+    После перезапуска уже оценённые в текущей итерации кандидаты не сжимаются
+    заново; оборванная при падении последняя строка пропускается.
+    """
+
+    def __init__(self, category):
+        self.path = f"checkpoint_{category}.jsonl"
+        self._file = None
+
+    @staticmethod
+    def members_key(members):
+        names = "\n".join(os.path.basename(p) for p in members)
+        return hashlib.sha1(names.encode('utf-8')).hexdigest()
+
+    def load(self, iteration, members_key):
+        scores = {}
+        if not os.path.exists(self.path):
+            return scores
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if rec.get('iteration') == iteration and rec.get('members') == members_key:
+                    scores[rec['candidate']] = rec['accuracy']
+        return scores
+
+    def append(self, iteration, members_key, candidate, accuracy):
+        if self._file is None:
+            self._file = open(self.path, 'a+b')
+            self._file.seek(0, os.SEEK_END)
+            if self._file.tell():
+                self._file.seek(-1, os.SEEK_END)
+                if self._file.read(1) != b'\n':
+                    self._file.write(b'\n')
+        rec = {
+            'iteration': iteration, 'members': members_key,
+            'candidate': candidate, 'accuracy': accuracy
+        }
+        self._file.write((json.dumps(rec, ensure_ascii=False) + '\n').encode('utf-8'))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def debug_core(category, target_size=None, stub_pool=None, baseline=None, commit=True):
+    """
+    Жадный подбор статей ядра category. Возвращает (выбранные статьи, точность).
+    При commit=False итоговый архив не пишется, а чекпоинт остаётся с пометкой
+    done — его записывает и удаляет debug_cores после всех тем.
+    """
+    if target_size is None:
+        target_size = MAX_DEBUG_ARTICLES
+    logger.info(f"=== Отладка для ядра «{category}», target={target_size} ===")
+    chk = checkpoint_path(category)
+    log = CandidateLog(category)
+    cand_dir = os.path.join(TEST_FOLDER, category)
+    candidates = [
+        os.path.join(cand_dir, f)
+        for f in os.listdir(cand_dir) if f.endswith('.txt')
+    ]
+
+    done, best_acc, stubs, seed = False, None, None, None
+    if os.path.exists(chk):
+        try:
+            with open(chk, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            selected  = [os.path.join(cand_dir, fn) for fn in state['selected']]
+            remaining = set(os.path.join(cand_dir, fn) for fn in state['remaining'])
+            iteration = state['iteration']
+            done, best_acc = state.get('done', False), state.get('accuracy')
+            stubs, seed = state.get('stubs'), state.get('seed')
+            logger.info(f"Чекпоинт {chk} загружен: ит={iteration}, sel={len(selected)}, rem={len(remaining)}")
+        except Exception:
+            logger.warning(f"Не удалось прочитать {chk}, старт заново")
+            selected, remaining, iteration = [], set(candidates), 1
+            log.remove()
+    else:
+        selected, remaining, iteration = [], set(candidates), 1
+        log.remove()
+        logger.info(f"«{category}»: начало без чекпоинта")
+
+    if not done and stub_pool is None:
+        stub_pool = load_stub_pool()
+
+    if seed is None:
+        seed = SEED if SEED is not None else random.randrange(2 ** 32)
+    stub_set = set()
+    if stubs is not None and not done:
+        missing = [s for s in stubs if s not in stub_pool]
+        if missing:
+            logger.warning(f"«{category}»: {len(missing)} stub’ов из чекпоинта нет в ядрах, они пропущены")
+        stub_set = set(s for s in stubs if s in stub_pool)
+    elif not done:
+        needed = target_size - len(selected)
+        if needed > 0:
+            if needed > len(stub_pool):
+                logger.warning(f"Нужны {needed}, а stub’ов всего {len(stub_pool)}")
+                needed = len(stub_pool)
+            rng = random.Random(f"{seed}:{category}")
+            stub_set = set(rng.sample(sorted(stub_pool), needed))
+            logger.info(f"«{category}»: добавлено {needed} stub’ов (seed={seed})")
+
+    def state(final=False):
+        return {
+            'selected':  [os.path.basename(p) for p in selected],
+            'remaining': sorted(os.path.basename(p) for p in remaining),
+            'iteration': iteration,
+            'accuracy':  best_acc,
+            'stubs':     sorted(stub_set),
+            'seed':      seed,
+            'done':      final
+        }
+
+    fixed, pool = None, None
+    if not done:
+        # Набор stub’ов и seed попадают в чекпоинт до первой оценки.
+        save_checkpoint(chk, state())
+        cores = list_cores(CORES_FOLDER)
+        with METRICS.timer("fixed_deltas"):
+            fixed = fixed_core_deltas(cores, category, ROOT_FOLDER, baseline)
+        logger.info(f"«{category}»: приросты по {len(cores) - (category in cores)} неизменным ядрам посчитаны для {len(fixed)} статей")
+
+    if fixed is not None and CANDIDATE_JOBS > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=CANDIDATE_JOBS,
+            initializer=_init_candidate_worker,
+            initargs=(
+                fixed, REGISTRY.backend, MAX_WORKERS, METRICS.enabled, NORMALIZER
+            )
+        )
+
+    try:
+        while not done and len(selected) < min(target_size, len(candidates)) and remaining:
+            best, top = None, -1.0
+            members = [stub_pool[s] for s in sorted(stub_set)] + selected
+            key = CandidateLog.members_key(members)
+            scored = log.load(iteration, key)
+            if scored:
+                logger.info(f"«{category}» ит{iteration}: из журнала взято {len(scored)} оценок")
+            tasks = [
+                (txt, members, category) for txt in sorted(remaining)
+                if os.path.basename(txt) not in scored
+            ]
+            if pool is not None:
+                results = pool.map(_evaluate_candidate, tasks)
+            else:
+                results = map(partial(_evaluate_candidate, fixed=fixed), tasks)
+            for (txt, _, _), (acc, snap) in zip(tasks, results):
+                METRICS.merge(snap)
+                log.append(iteration, key, os.path.basename(txt), acc)
+                scored[os.path.basename(txt)] = acc
+                logger.info(f"«{category}» ит{iteration}: пробуем «{os.path.basename(txt)}» → {acc:.2f}%")
+            # Кандидаты перебираются в отсортированном порядке, поэтому при равной
+            # точности выбор не зависит от того, какой процесс закончил первым.
+            for txt in sorted(remaining):
+                acc = scored[os.path.basename(txt)]
+                if acc > top:
+                    top, best = acc, txt
+
+            if not best:
+                logger.warning(f"«{category}» ит{iteration}: нет улучшений, выходим")
+                break
+
+            removed_stub = None
+            if stub_set:
+                rng = random.Random(f"{seed}:{category}:{iteration}")
+                removed_stub = rng.choice(sorted(stub_set))
+                stub_set.remove(removed_stub)
+
+            best_acc = top
+            selected.append(best)
+            remaining.remove(best)
+            logger.info(
+                f"«{category}» ит{iteration}: выбрано «{os.path.basename(best)}» "
+                f"(acc={best_acc:.2f}%), удалён stub «{os.path.basename(removed_stub) if removed_stub else '-'}»"
+            )
+
+            iteration += 1
+            save_checkpoint(chk, state())
+            logger.info(f"Чекпоинт {chk} сохранён (ит={iteration})")
+    finally:
+        log.close()
+        if pool is not None:
+            pool.shutdown()
+
+    if not commit:
+        save_checkpoint(chk, state(final=True))
+        log.remove()
+        return selected, best_acc
+
+    write_core(category, selected)
+    return selected, best_acc
+
+def write_core(category, selected):
+    final = os.path.join(CORES_FOLDER, f"{category}.7z")
+    create_7z_archive(final, selected, ZIP_TOOL, category_name=category, normalizer=NORMALIZER)
+    chk = checkpoint_path(category)
+    CandidateLog(category).remove()
+    if os.path.exists(chk):
+        os.remove(chk)
+        logger.info(f"Чекпоинт {chk} удалён")
+    logger.info(f"=== Готово: в ядре «{os.path.basename(final)}» {len(selected)} статей ===")
+
+def select_categories(accs, threshold=None, bottom=None):
+    """Темы для отладки: с точностью ниже threshold и/или bottom худших."""
+    ranked = sorted(accs, key=lambda c: (accs[c], c))
+    if threshold is not None:
+        ranked = [c for c in ranked if accs[c] < threshold]
+    if bottom is not None:
+        ranked = ranked[:bottom]
+    return ranked
+
+def debug_cores(categories, category_jobs=1, baseline=None):
+    """
+    Отладить несколько ядер за один запуск. Поиски идут параллельно и видят
+    исходные ядра остальных тем: список stub’ов строится один раз, приросты
+    по неизменным ядрам берутся из общего базового прохода, а новые архивы
+    записываются только после того, как закончены все темы. Каждая тема
+    ведёт свой чекпоинт, поэтому прерванный запуск продолжается с места
+    остановки. Возвращает {тема: (выбранные статьи, точность)}.
+    """
+    chosen = {}
+    stub_pool = load_stub_pool()
+    with ThreadPoolExecutor(max_workers=max(1, category_jobs)) as executor:
+        futures = {
+            cat: executor.submit(debug_core, cat, None, stub_pool, baseline, False)
+            for cat in categories
+        }
+        for cat, future in futures.items():
+            try:
+                chosen[cat] = future.result()
+            except Exception as e:
+                logger.error(f"Отладка ядра «{cat}» прервана: {e}; чекпоинт сохранён")
+
+    for cat in categories:
+        if cat in chosen:
+            write_core(cat, chosen[cat][0])
+    return chosen
+
+def main(argv=None, prog=None):
+    parser = build_parser(prog)
+    args = parser.parse_args(argv)
+    normalizer = normalize.from_args(parser, args)
+    if args.profile:
+        metrics.enable(args.profile, args.profile_format)
+    logging.basicConfig(
+        filename='classification.log',
+        level=logging.INFO,
+        format='%(asctime)s %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    configure(args, normalizer)
+    try:
+        # Приросты базового прохода переиспользуются для неизменных ядер.
+        baseline = {}
+        with METRICS.timer("baseline"):
+            accs = compute_accuracy_per_category(
+                ROOT_FOLDER, CORES_FOLDER, ZIP_TOOL, args.matrix, baseline
+            )
+        if args.threshold is None and args.bottom is None:
+            worst = min(accs, key=accs.get)
+            logger.info(f"Worst core={worst} acc={accs[worst]:.2f}%")
+            debug_core(worst, baseline=baseline)
+            return
+
+        categories = select_categories(accs, args.threshold, args.bottom)
+        logger.info(
+            f"Ядра для отладки ({len(categories)}): "
+            + ", ".join(f"{c}={accs[c]:.2f}%" for c in categories)
+        )
+        chosen = debug_cores(categories, args.category_jobs, baseline)
+        for cat in categories:
+            if cat not in chosen:
+                print(f"{cat}: ошибка, см. classification.log")
+                continue
+            selected, acc = chosen[cat]
+            after = f"{acc:.2f}%" if acc is not None else "-"
+            print(f"{cat}: {accs[cat]:.2f}% → {after}, статей в ядре {len(selected)}")
+    finally:
+        if CACHE is not None:
+            CACHE.close()
+
+if __name__ == '__main__':
+    main()
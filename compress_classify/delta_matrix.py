@@ -0,0 +1,97 @@
+import numpy as np
+
+class DeltaMatrix:
+    """
+    Результат прогона классификации: приросты статьи×ядра.
+    deltas[i, j] — прирост статьи paths[i] для ядра categories[j]
+    (NaN, если пара не посчитана), labels[i] — истинная тема статьи.
+    Все метрики считаются векторно по этой матрице без повторного сжатия.
+    """
+
+    def __init__(self, deltas, categories, labels, paths):
+        self.deltas = np.asarray(deltas, dtype=np.float64)
+        self.categories = np.asarray(categories, dtype=str)
+        self.labels = np.asarray(labels, dtype=str)
+        self.paths = np.asarray(paths, dtype=str)
+
+    @classmethod
+    def from_rows(cls, texts, rows, categories):
+        """texts: [(тема, путь)], rows: [{категория: прирост}] в том же порядке."""
+        categories = sorted(categories)
+        col = {c: j for j, c in enumerate(categories)}
+        deltas = np.full((len(rows), len(categories)), np.nan)
+        for i, diffs in enumerate(rows):
+            for cat, diff in diffs.items():
+                deltas[i, col[cat]] = diff
+        labels = [cat for cat, _ in texts]
+        paths = [path for _, path in texts]
+        return cls(deltas, categories, labels, paths)
+
+    def save(self, path):
+        np.savez_compressed(
+            path, deltas=self.deltas, categories=self.categories,
+            labels=self.labels, paths=self.paths
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f["deltas"], f["categories"], f["labels"], f["paths"])
+
+    def _scores(self, drop=()):
+        scores = np.where(np.isnan(self.deltas), np.inf, self.deltas)
+        if drop:
+            scores = scores.copy()
+            scores[:, np.isin(self.categories, list(drop))] = np.inf
+        return scores
+
+    def predictions(self, drop=()):
+        """Предсказанные темы; при равенстве побеждает ядро с меньшим именем."""
+        scores = self._scores(drop)
+        pred = self.categories[np.argmin(scores, axis=1)].astype(object)
+        pred[~np.isfinite(scores).any(axis=1)] = None
+        return pred
+
+    def correct(self, drop=()):
+        return self.predictions(drop) == self.labels.astype(object)
+
+    def accuracy(self, drop=()):
+        return float(self.correct(drop).mean() * 100) if len(self.labels) else 0.0
+
+    def per_category_accuracy(self, drop=()):
+        correct = self.correct(drop)
+        names, inverse = np.unique(self.labels, return_inverse=True)
+        totals = np.bincount(inverse, minlength=len(names))
+        hits = np.bincount(inverse, weights=correct, minlength=len(names))
+        return {str(n): float(h / t * 100) for n, h, t in zip(names, hits, totals)}
+
+    def confusion_matrix(self, drop=()):
+        """Матрица (истинные темы × ядра) и подписи строк и столбцов."""
+        names = np.unique(self.labels)
+        scores = self._scores(drop)
+        pred = np.argmin(scores, axis=1)
+        valid = np.isfinite(scores).any(axis=1)
+        rows = np.searchsorted(names, self.labels)
+        cm = np.zeros((len(names), len(self.categories)), dtype=np.int64)
+        np.add.at(cm, (rows[valid], pred[valid]), 1)
+        return cm, names, self.categories
+
+    def top_k_accuracy(self, k, drop=()):
+        """Доля статей, у которых истинное ядро среди k лучших."""
+        scores = self._scores(drop)
+        col = {c: j for j, c in enumerate(self.categories)}
+        idx = np.array([col.get(label, -1) for label in self.labels])
+        has = idx >= 0
+        true_scores = np.full(len(idx), np.inf)
+        true_scores[has] = scores[has, idx[has]]
+        cats = self.categories[None, :]
+        better = (scores < true_scores[:, None]) | (
+            (scores == true_scores[:, None]) & (cats < self.labels[:, None])
+        )
+        rank = better.sum(axis=1)
+        ok = has & np.isfinite(true_scores) & (rank < k)
+        return float(ok.mean() * 100) if len(ok) else 0.0
+
+    def without_core(self, category):
+        """Точность по темам, если убрать ядро category ("что, если")."""
+        return self.per_category_accuracy(drop=(category,))
@@ -0,0 +1,61 @@
+import os
+import time
+import sqlite3
+
+DEFAULT_MANIFEST_PATH = "totxt_manifest.sqlite"
+
+class ConversionManifest:
+    """
+    Манифест конвертации PDF → TXT в SQLite: для каждого PDF (по абсолютному
+    пути) — размер, mtime и хеш исходника, версия извлечения, путь, размер и
+    хеш результата. Повторный запуск сверяет stat и пропускает неизменные
+    файлы без чтения; хеш считается, только если stat изменился.
+    """
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " pdf TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime INTEGER NOT NULL,"
+            " sha256 TEXT NOT NULL, extractor TEXT NOT NULL,"
+            " txt TEXT NOT NULL, txt_size INTEGER NOT NULL, txt_sha256 TEXT NOT NULL,"
+            " converted REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def entries(self):
+        """{pdf: строка манифеста в виде словаря}; читается один раз за запуск."""
+        cur = self._conn.execute("SELECT * FROM files")
+        names = [d[0] for d in cur.description]
+        return {row[0]: dict(zip(names, row)) for row in cur}
+
+    def put(self, pdf, size, mtime, sha256, extractor, txt, txt_size, txt_sha256):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (pdf, size, mtime, sha256, extractor, txt, txt_size, txt_sha256, time.time())
+        )
+        self._conn.commit()
+
+    def touch(self, pdf, size, mtime):
+        """PDF перезаписан без изменений: обновить только stat."""
+        self._conn.execute("UPDATE files SET size=?, mtime=? WHERE pdf=?", (size, mtime, pdf))
+        self._conn.commit()
+
+    def remove(self, pdfs):
+        """Удалить записи о PDF, которых больше нет."""
+        self._conn.executemany("DELETE FROM files WHERE pdf=?", ((p,) for p in pdfs))
+        self._conn.commit()
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+def open_manifest(path):
+    """Открыть манифест; path=None отключает его."""
+    if not path:
+        return None
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return ConversionManifest(path)
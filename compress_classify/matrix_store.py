@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import threading
+
+DEFAULT_STORE_PATH = "matrix_store.sqlite"
+
+def store_settings(backend):
+    """Ключ настроек сжатия: матрицы разных бэкендов и уровней не смешиваются."""
+    if backend is None or not backend.in_memory:
+        return "7z:mx9"
+    return f"{backend.name}:{backend.level}"
+
+class MatrixStore:
+    """
+    Постоянное хранилище матриц updateCore в SQLite: размеры C(x) и
+    отношения пар по категориям. Ключ — хеши содержимого файлов и
+    настройки сжатия, так что переименование файла ничего не пересчитывает,
+    а изменённый файл получает новые строку и столбец.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sizes ("
+            " category TEXT NOT NULL, settings TEXT NOT NULL, file TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " PRIMARY KEY (category, settings, file))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ratios ("
+            " category TEXT NOT NULL, settings TEXT NOT NULL,"
+            " row TEXT NOT NULL, col TEXT NOT NULL, ratio REAL NOT NULL,"
+            " PRIMARY KEY (category, settings, row, col))"
+        )
+        self._conn.commit()
+
+    def sizes(self, category, settings):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file, size FROM sizes WHERE category=? AND settings=?",
+                (category, settings)
+            ).fetchall()
+        return dict(rows)
+
+    def ratios(self, category, settings):
+        """{(хеш строки, хеш столбца): отношение}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row, col, ratio FROM ratios WHERE category=? AND settings=?",
+                (category, settings)
+            ).fetchall()
+        return {(r, c): v for r, c, v in rows}
+
+    def put_sizes(self, category, settings, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sizes VALUES (?, ?, ?, ?)",
+                ((category, settings, h, size) for h, size in items)
+            )
+            self._conn.commit()
+
+    def put_ratios(self, category, settings, items):
+        """items: [((хеш строки, хеш столбца), отношение)]."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ratios VALUES (?, ?, ?, ?, ?)",
+                ((category, settings, r, c, v) for (r, c), v in items)
+            )
+            self._conn.commit()
+
+    def prune(self, category, hashes):
+        """Удалить всё о файлах категории, которых больше нет. Возвращает число удалённых файлов."""
+        with self._lock:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS present (file TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM present")
+            self._conn.executemany("INSERT OR IGNORE INTO present VALUES (?)", ((h,) for h in hashes))
+            removed = self._conn.execute(
+                "SELECT COUNT(DISTINCT file) FROM sizes WHERE category=? AND file NOT IN present",
+                (category,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "DELETE FROM sizes WHERE category=? AND file NOT IN present", (category,)
+            )
+            self._conn.execute(
+                "DELETE FROM ratios WHERE category=? AND (row NOT IN present OR col NOT IN present)",
+                (category,)
+            )
+            self._conn.commit()
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM sizes")
+            self._conn.execute("DELETE FROM ratios")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+def open_store(path, clear=False):
+    """Открыть хранилище; path=None отключает его."""
+    if not path:
+        return None
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    store = MatrixStore(path)
+    if clear:
+        store.clear()
+    return store
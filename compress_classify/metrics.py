@@ -0,0 +1,164 @@
+import os
+import re
+import json
+import time
+import atexit
+import signal
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+class _NoTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_TIMER = _NoTimer()
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.stage, time.perf_counter() - self.start)
+        return False
+
+class Metrics:
+    """
+    Таймеры этапов и счётчики горячего пути. По умолчанию выключены:
+    timer() возвращает общий пустой контекстный менеджер, count() сразу
+    выходит, так что накладные расходы — одна проверка флага.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timers = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def timer(self, stage):
+        return _Timer(self, stage) if self.enabled else _NO_TIMER
+
+    def add_time(self, stage, seconds, calls=1):
+        with self._lock:
+            entry = self.timers.setdefault(stage, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self, reset=False):
+        with self._lock:
+            snap = {
+                "timers": {k: list(v) for k, v in self.timers.items()},
+                "counters": dict(self.counters),
+            }
+            if reset:
+                self.timers.clear()
+                self.counters.clear()
+        return snap
+
+    def merge(self, snap):
+        """Добавить снимок из другого процесса (например, рабочего пула)."""
+        if not snap:
+            return
+        for stage, (calls, seconds) in snap["timers"].items():
+            self.add_time(stage, seconds, calls)
+        with self._lock:
+            for name, n in snap["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_json(self):
+        snap = self.snapshot()
+        return {
+            "timers": {
+                k: {"calls": c, "seconds": round(s, 6)} for k, (c, s) in sorted(snap["timers"].items())
+            },
+            "counters": dict(sorted(snap["counters"].items())),
+        }
+
+    def to_prometheus(self, prefix="compress_classify"):
+        snap = self.snapshot()
+        lines = [
+            f"# TYPE {prefix}_stage_seconds_total counter",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        for stage, (calls, seconds) in sorted(snap["timers"].items()):
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {seconds:.6f}')
+            lines.append(f'{prefix}_stage_calls_total{{stage="{stage}"}} {calls}')
+        for name, value in sorted(snap["counters"].items()):
+            metric = f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path, fmt="json"):
+        text = (
+            self.to_prometheus() if fmt == "prom"
+            else json.dumps(self.to_json(), ensure_ascii=False, indent=2)
+        )
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+METRICS = Metrics()
+
+def enable(path=None, fmt="json"):
+    """
+    Включить профилирование. Если задан path, метрики пишутся туда в конце
+    запуска и по сигналу SIGUSR1 (где он есть). Обработчик сигнала только
+    будит поток записи: в самом обработчике нельзя брать блокировку METRICS,
+    которую в этот момент может держать прерванный count().
+    """
+    METRICS.enabled = True
+    if not path:
+        return
+    atexit.register(METRICS.dump, path, fmt)
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        requested = threading.Event()
+
+        def writer():
+            while True:
+                requested.wait()
+                requested.clear()
+                try:
+                    METRICS.dump(path, fmt)
+                except OSError as e:
+                    logger.error(f"Не удалось записать метрики в {path}: {e}")
+
+        threading.Thread(target=writer, name="metrics-dump", daemon=True).start()
+        signal.signal(signal.SIGUSR1, lambda *_: requested.set())
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="Включить профилирование этапов и записать метрики в этот файл"
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=["json", "prom"],
+        default="json",
+        help="Формат метрик: JSON или текстовый файл Prometheus (по умолчанию %(default)s)"
+    )
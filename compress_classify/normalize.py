@@ -0,0 +1,186 @@
+import os
+import re
+import hashlib
+import tempfile
+from collections import Counter
+
+from .metrics import METRICS
+
+# Меняется вместе с поведением шагов: старые нормализованные копии не используются.
+NORMALIZE_VERSION = 1
+
+LIGATURES = {
+    "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi",
+    "\ufb04": "ffl", "\ufb05": "st", "\ufb06": "st",
+    "\u00a0": " ", "\u2009": " ", "\u202f": " ",
+}
+_GARBAGE = re.compile(r"\(cid:\d+\)|[\u00ad\u200b-\u200d\ufeff\ufffd]|[\x00-\x08\x0b\x0e-\x1f\x7f]")
+_HYPHEN = re.compile(r"(?<=\w)[-\u2010]\s*\n\s*(?=[a-zа-яё])")
+_PAGE_NUMBER = re.compile(r"^\s*(?:стр\.?|с\.|page|p\.)?\s*\d{1,4}\s*$", re.I)
+_REFERENCES = re.compile(
+    r"^[ \t]*(?:\d+\.?\s*)?(?:список литературы|список использованной литературы|литература|"
+    r"библиографический список|список источников|references|bibliography)[ \t]*[:.]?[ \t]*$",
+    re.I | re.M
+)
+
+def fix_ligatures(text):
+    """Лигатуры PDF (fi, fl…), мягкие переносы, нулевые пробелы, (cid:NN) и управляющие символы."""
+    for src, dst in LIGATURES.items():
+        text = text.replace(src, dst)
+    return _GARBAGE.sub("", text)
+
+def dehyphenate(text):
+    """Склеить слова, разорванные переносом в конце строки."""
+    return _HYPHEN.sub("", text)
+
+def strip_headers(text, min_repeats=3, max_length=100):
+    """Убрать колонтитулы — короткие строки, повторяющиеся на многих страницах, — и номера страниц."""
+    lines = text.split("\n")
+    counts = Counter(line.strip() for line in lines)
+    return "\n".join(
+        line for line in lines
+        if not _PAGE_NUMBER.match(line)
+        and not (line.strip() and len(line.strip()) <= max_length and counts[line.strip()] >= min_repeats)
+    )
+
+def strip_references(text, min_share=0.5):
+    """Отрезать список литературы: последний такой заголовок во второй половине текста и всё после него."""
+    last = None
+    for last in _REFERENCES.finditer(text):
+        pass
+    if last is not None and last.start() >= len(text) * min_share:
+        return text[:last.start()]
+    return text
+
+def collapse_whitespace(text):
+    """Серии пробелов — в один пробел, пустые строки — не больше одной подряд."""
+    text = re.sub(r"[ \t\f\v\r]+", " ", text)
+    text = re.sub(r" ?\n ?", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+def truncate(text, max_bytes):
+    """Обрезать до max_bytes байт UTF-8, не разрывая символ."""
+    data = text.encode("utf-8")
+    if len(data) <= max_bytes:
+        return text
+    return data[:max_bytes].decode("utf-8", errors="ignore")
+
+STEPS = {
+    "ligatures": fix_ligatures,
+    "dehyphenate": dehyphenate,
+    "headers": strip_headers,
+    "references": strip_references,
+    "whitespace": collapse_whitespace,
+}
+
+class Normalizer:
+    """
+    Нормализация текста перед сжатием: шаги из STEPS (всегда в порядке STEPS)
+    и обрезка до max_bytes. Нормализованная копия статьи хранится рядом с
+    оригиналом в папке .norm-<ключ настроек> под тем же именем и
+    пересоздаётся, если оригинал изменился; сами статьи не меняются.
+    """
+
+    def __init__(self, steps=tuple(STEPS), max_bytes=None):
+        unknown = set(steps) - set(STEPS)
+        if unknown:
+            raise ValueError(f"Неизвестные шаги нормализации: {', '.join(sorted(unknown))}")
+        self.steps = tuple(s for s in STEPS if s in steps)
+        self.max_bytes = max_bytes
+        spec = f"v{NORMALIZE_VERSION}:{','.join(self.steps)}:{max_bytes}"
+        self.key = hashlib.sha1(spec.encode("utf-8")).hexdigest()[:8]
+
+    def __repr__(self):
+        return f"Normalizer(steps={self.steps}, max_bytes={self.max_bytes})"
+
+    def normalize(self, text):
+        for step in self.steps:
+            text = STEPS[step](text)
+        if self.max_bytes:
+            text = truncate(text, self.max_bytes)
+        return text
+
+    def normalize_bytes(self, data):
+        return self.normalize(data.decode("utf-8", errors="replace")).encode("utf-8")
+
+    def cache_path(self, text_file):
+        folder, name = os.path.split(os.path.abspath(text_file))
+        return os.path.join(folder, f".norm-{self.key}", name)
+
+    def path(self, text_file):
+        """Путь к нормализованной копии text_file; копия создаётся при необходимости."""
+        target = self.cache_path(text_file)
+        st = os.stat(text_file)
+        try:
+            if os.stat(target).st_mtime_ns == st.st_mtime_ns:
+                METRICS.count("normalize_hits")
+                return target
+        except FileNotFoundError:
+            pass
+        with METRICS.timer("normalize"):
+            with open(text_file, "rb") as f:
+                data = f.read()
+            out = self.normalize_bytes(data)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(out)
+            # mtime копии равен mtime оригинала: так видно, что оригинал менялся.
+            os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.replace(tmp, target)
+        METRICS.count("normalize_bytes_in", len(data))
+        METRICS.count("normalize_bytes_out", len(out))
+        return target
+
+def prune(folder):
+    """Удалить из .norm-* в folder копии статей, оригиналов которых уже нет; вернуть их число."""
+    removed = 0
+    for entry in os.listdir(folder):
+        norm_dir = os.path.join(folder, entry)
+        if not entry.startswith(".norm-") or not os.path.isdir(norm_dir):
+            continue
+        for name in os.listdir(norm_dir):
+            if not os.path.exists(os.path.join(folder, name)):
+                os.remove(os.path.join(norm_dir, name))
+                removed += 1
+        if not os.listdir(norm_dir):
+            os.rmdir(norm_dir)
+    return removed
+
+def make_normalizer(spec=None, max_bytes=None):
+    """spec: None — без нормализации, "all" — все шаги, иначе шаги через запятую."""
+    if not spec and not max_bytes:
+        return None
+    if not spec or spec == "none":
+        steps = ()
+    elif spec == "all":
+        steps = tuple(STEPS)
+    else:
+        steps = tuple(s.strip() for s in spec.split(",") if s.strip())
+    return Normalizer(steps, max_bytes)
+
+def source_path(normalizer, text_file):
+    """Файл, который сжимается вместо text_file: нормализованная копия или он сам."""
+    return normalizer.path(text_file) if normalizer is not None else text_file
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--normalize",
+        default=None,
+        metavar="STEPS",
+        help="Нормализация текста перед сжатием: all или шаги через запятую "
+             f"({', '.join(STEPS)}); копии хранятся рядом со статьями в .norm-*"
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=None,
+        help="Обрезать нормализованный текст до стольких байт"
+    )
+
+def from_args(parser, args):
+    try:
+        return make_normalizer(args.normalize, args.max_bytes)
+    except ValueError as e:
+        parser.error(str(e))
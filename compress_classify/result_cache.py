@@ -0,0 +1,135 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from multiprocessing.util import Finalize
+
+DEFAULT_CACHE_PATH = "compress_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 2_000_000
+# Столько отметок использования копится в памяти до записи одним executemany.
+TOUCH_BATCH = 1000
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class ResultCache:
+    """
+    Постоянный кеш приростов в SQLite: ключ — (хеш статьи, хеш ядра,
+    бэкенд, уровень). При превышении max_entries удаляются записи,
+    которые дольше всего не использовались. Время использования при
+    попадании запоминается в памяти и пишется пачкой (вместе с вытеснением
+    и при close), так что чтение из кеша не берёт блокировку записи SQLite
+    на каждую пару.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._inserts = 0
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS deltas ("
+            " article TEXT NOT NULL, core TEXT NOT NULL,"
+            " backend TEXT NOT NULL, level TEXT NOT NULL,"
+            " delta INTEGER NOT NULL, used REAL NOT NULL,"
+            " PRIMARY KEY (article, core, backend, level))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS deltas_used ON deltas(used)")
+        self._conn.commit()
+
+    def get(self, article, core, backend, level):
+        key = (article, core, backend, str(level))
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT delta FROM deltas WHERE article=? AND core=? AND backend=? AND level=?",
+                key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._flush_touched()
+                self._conn.commit()
+        return row[0]
+
+    def _flush_touched(self):
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE deltas SET used=? WHERE article=? AND core=? AND backend=? AND level=?",
+            ((used,) + key for key, used in self._touched.items())
+        )
+        self._touched = {}
+
+    def put(self, article, core, backend, level, delta):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO deltas VALUES (?, ?, ?, ?, ?, ?)",
+                (article, core, backend, str(level), delta, time.time())
+            )
+            self._inserts += 1
+            if self._inserts % 1000 == 0:
+                self._flush_touched()
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM deltas").fetchone()[0]
+        extra = count - self.max_entries
+        if extra > 0:
+            self._conn.execute(
+                "DELETE FROM deltas WHERE rowid IN "
+                "(SELECT rowid FROM deltas ORDER BY used LIMIT ?)",
+                (extra,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._touched = {}
+            self._conn.execute("DELETE FROM deltas")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush_touched()
+            self._evict()
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+def open_cache(path, max_entries=DEFAULT_MAX_ENTRIES, clear=False):
+    """Открыть кеш; path=None отключает кеш."""
+    if not path:
+        return None
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    cache = ResultCache(path, max_entries)
+    if clear:
+        cache.clear()
+    return cache
+
+def open_worker_cache(path, max_entries=DEFAULT_MAX_ENTRIES):
+    """Кеш рабочего процесса пула: закрывается (и сбрасывает отметки) при выходе процесса."""
+    cache = open_cache(path, max_entries)
+    if cache is not None:
+        Finalize(cache, cache.close, exitpriority=10)
+    return cache
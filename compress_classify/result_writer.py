@@ -0,0 +1,88 @@
+import os
+import csv
+import json
+import time
+import queue
+import threading
+
+_STOP = object()
+
+class ResultWriter:
+    """
+    Неблокирующая запись результатов по статьям. write() только кладёт
+    запись в очередь; фоновый поток пишет записи пачками и сбрасывает файл
+    каждые flush_every записей или flush_interval секунд.
+    Формат выбирается по расширению: .csv — строка на статью со столбцом
+    на каждое ядро, иначе JSON Lines.
+    """
+
+    def __init__(self, path, categories=(), flush_every=256, flush_interval=1.0):
+        self.path = path
+        self.categories = sorted(categories)
+        self.csv = path.lower().endswith(".csv")
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.written = 0
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if self.csv:
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(["article", "label", "predicted"] + self.categories)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, article, predicted, deltas, label=None):
+        self._queue.put((article, label, predicted, deltas))
+
+    def _emit(self, record):
+        article, label, predicted, deltas = record
+        if self._csv is not None:
+            self._csv.writerow(
+                [article, label or "", predicted or ""]
+                + [deltas.get(cat, "") for cat in self.categories]
+            )
+        else:
+            self._file.write(json.dumps(
+                {"article": article, "label": label, "predicted": predicted,
+                 "deltas": dict(sorted(deltas.items()))},
+                ensure_ascii=False
+            ) + "\n")
+        self.written += 1
+
+    def _run(self):
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            try:
+                record = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                record = None
+            if record is _STOP:
+                break
+            if record is not None:
+                self._emit(record)
+                pending += 1
+            if pending and (pending >= self.flush_every
+                            or time.monotonic() - last_flush >= self.flush_interval):
+                self._file.flush()
+                pending = 0
+                last_flush = time.monotonic()
+        self._file.flush()
+
+    def close(self):
+        """Дописать всё из очереди и закрыть файл."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
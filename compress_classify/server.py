@@ -0,0 +1,230 @@
+import os
+import json
+import queue
+import sys
+import shutil
+import signal
+import logging
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .backends import private_workdir
+from .core_registry import CoreRegistry, list_cores
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+def core_set_key(cores_folder):
+    return os.path.realpath(cores_folder)
+
+def safe_name(name):
+    """Имя файла статьи от клиента: только базовое имя без разделителей, иначе article.txt."""
+    base = os.path.basename(name.replace("\\", "/"))
+    if base in ("", ".", "..") or "/" in base or "\\" in base or "\0" in base:
+        return "article.txt"
+    return base
+
+class _Request:
+    def __init__(self, key, name, data):
+        self.key = key
+        self.name = name
+        self.data = data
+        self.text_file = None
+        self.diffs = {}
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+class ClassificationService:
+    """
+    Резидентный классификатор: наборы ядер загружаются и прогреваются один
+    раз, а запросы, пришедшие почти одновременно, собираются в пакет и
+    считаются на общем пуле потоков.
+    """
+
+    def __init__(self, cores_folders, backend, max_workers=None,
+                 batch_window=0.02, max_batch=32):
+        self.backend = backend
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.workdir = private_workdir("ccsrv_")
+        self.core_sets = {}
+        for folder in cores_folders:
+            registry = CoreRegistry(backend)
+            zip_cores = list_cores(folder)
+            for core in zip_cores.values():
+                registry.primed(core)
+            self.core_sets[core_set_key(folder)] = (registry, zip_cores)
+            logger.info(f"Загружен набор ядер {folder}: {len(zip_cores)} ядер")
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def find(self, cores_folder):
+        key = core_set_key(cores_folder)
+        if key in self.core_sets:
+            return key
+        matches = [k for k in self.core_sets if os.path.basename(k) == os.path.basename(key)]
+        return matches[0] if len(matches) == 1 else None
+
+    def submit(self, key, name, data):
+        req = _Request(key, safe_name(name), data)
+        self._queue.put(req)
+        return req.future
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._run(batch)
+            except Exception as e:
+                for req in batch:
+                    if not req.future.done():
+                        req.future.set_exception(e)
+
+    def _materialize(self, req):
+        with self._counter_lock:
+            self._counter += 1
+            req_dir = os.path.join(self.workdir, str(self._counter))
+        os.makedirs(req_dir)
+        try:
+            text_file = os.path.join(req_dir, req.name)
+            with open(text_file, "wb") as f:
+                f.write(req.data)
+        except Exception:
+            shutil.rmtree(req_dir, ignore_errors=True)
+            raise
+        req.text_file = text_file
+
+    def _run(self, batch):
+        if METRICS.enabled:
+            now = time.perf_counter()
+            for req in batch:
+                METRICS.add_time("queue_wait", now - req.enqueued)
+            METRICS.count("batches")
+        # Ошибка одного запроса отдаётся только его клиенту, остальные запросы пакета считаются.
+        pending = []
+        for req in batch:
+            try:
+                registry, zip_cores = self.core_sets[req.key]
+                if self.backend.in_memory:
+                    req.text_file = req.name
+                else:
+                    self._materialize(req)
+            except Exception as e:
+                req.future.set_exception(e)
+                continue
+            for cat, core in zip_cores.items():
+                fut = self._executor.submit(registry.diff, core, req.text_file, req.data)
+                pending.append((req, cat, fut))
+
+        for req, cat, fut in pending:
+            try:
+                diff = fut.result()
+            except Exception as e:
+                if not req.future.done():
+                    req.future.set_exception(e)
+                continue
+            if diff is not None:
+                req.diffs[cat] = diff
+
+        for req in batch:
+            if not self.backend.in_memory and req.text_file is not None:
+                shutil.rmtree(os.path.dirname(req.text_file), ignore_errors=True)
+            if req.future.done():
+                continue
+            best = min(req.diffs.items(), key=lambda x: (x[1], x[0]))[0] if req.diffs else None
+            req.future.set_result({"category": best, "diffs": req.diffs})
+
+def _make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, code, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if urllib.parse.urlparse(self.path).path != "/health":
+                return self._reply(404, {"error": "not found"})
+            self._reply(200, {
+                "backend": service.backend.name,
+                "core_sets": {k: sorted(z) for k, (_, z) in service.core_sets.items()}
+            })
+
+        def do_POST(self):
+            url = urllib.parse.urlparse(self.path)
+            if url.path != "/classify":
+                return self._reply(404, {"error": "not found"})
+            params = urllib.parse.parse_qs(url.query)
+            key = service.find(params.get("cores", [""])[0])
+            if key is None:
+                return self._reply(404, {"error": "набор ядер не загружен"})
+            length = int(self.headers.get("Content-Length", 0))
+            data = self.rfile.read(length)
+            try:
+                result = service.submit(key, params.get("name", [""])[0], data).result()
+            except Exception as e:
+                return self._reply(500, {"error": str(e)})
+            self._reply(200, result)
+
+        def log_message(self, fmt, *args):
+            logger.debug(fmt % args)
+
+    return Handler
+
+def serve(service, host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), _make_handler(service))
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    logger.info(f"Сервер классификации слушает http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info("Сервер классификации остановлен")
+
+def classify_remote(server_url, cores_folder, text_file, timeout=600):
+    """
+    Отправить статью резидентному серверу. Возвращает тему или None;
+    при недоступности сервера или незагруженном наборе ядер — RuntimeError.
+    """
+    with open(text_file, "rb") as f:
+        data = f.read()
+    query = urllib.parse.urlencode({
+        "cores": core_set_key(cores_folder),
+        "name": os.path.basename(text_file),
+    })
+    req = urllib.request.Request(
+        f"{server_url.rstrip('/')}/classify?{query}", data=data, method="POST",
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))["category"]
+    except urllib.error.HTTPError as e:
+        try:
+            msg = json.loads(e.read().decode("utf-8")).get("error", e.reason)
+        except ValueError:
+            msg = e.reason
+        raise RuntimeError(f"сервер ответил {e.code}: {msg}")
+    except (urllib.error.URLError, OSError) as e:
+        raise RuntimeError(f"сервер недоступен: {e}")
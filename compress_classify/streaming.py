@@ -0,0 +1,87 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .backends import read_article
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+class StreamingScorer:
+    """
+    Потоковая оценка с ранней остановкой. Статья подаётся всем ядрам
+    кусками по chunk_size байт; после каждого куска ядра, отставшие от
+    лидера больше, чем rate * (оставшиеся байты) + slack, отбрасываются.
+    Если у бэкенда ограничено окно (window), в остатке учитываются только
+    байты, которые ещё могут сослаться на ядро: после window байт статьи
+    разрыв между ядрами почти не меняется.
+    Оценка заканчивается, когда осталось одно ядро, статья кончилась или
+    подано budget байт. Статья не длиннее одного куска оценивается целиком,
+    с тем же результатом, что и без потокового режима.
+    Нужен бэкенд с копируемым состоянием (streamable), т.е. zlib.
+    Интерфейс diffs() как у CoreRegistry.
+    """
+
+    def __init__(self, registry, chunk_size=16384, budget=None, rate=0.05, slack=64):
+        if not registry.backend.streamable:
+            raise ValueError(f"Бэкенд {registry.backend.name} не поддерживает потоковую оценку")
+        self.registry = registry
+        self.window = getattr(registry.backend, "window", None)
+        self.chunk_size = chunk_size
+        self.budget = budget
+        self.rate = rate
+        self.slack = slack
+        self.bytes_total = 0
+        self.bytes_fed = 0
+        self.early_stops = 0
+
+    def _streams(self, zip_cores):
+        streams = {}
+        for cat, core in zip_cores.items():
+            try:
+                streams[cat] = self.registry.backend.stream(self.registry.primed(core))
+            except Exception as e:
+                logger.error(f"Ошибка при подготовке ядра {core}: {e}")
+        return streams
+
+    def diffs(self, zip_cores, text_file, max_workers=None):
+        data = read_article(text_file)
+        limit = len(data) if self.budget is None else min(len(data), self.budget)
+        streams = self._streams(zip_cores)
+        deltas = {}
+        pos = 0
+
+        def step(stream):
+            with METRICS.timer("stream_chunk"):
+                stream.feed(chunk)
+                return stream.delta()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while streams:
+                chunk = data[pos:min(pos + self.chunk_size, limit)]
+                pos += len(chunk)
+                deltas = dict(zip(streams, executor.map(step, streams.values())))
+                if pos >= limit:
+                    break
+                lead = min(deltas.values())
+                left = limit - pos
+                if self.window is not None:
+                    left = max(0, min(left, self.window - pos))
+                reach = self.rate * left + self.slack
+                streams = {c: s for c, s in streams.items() if deltas[c] - lead <= reach}
+                if len(streams) == 1:
+                    break
+
+        self.bytes_total += len(data)
+        self.bytes_fed += pos
+        if pos < len(data):
+            self.early_stops += 1
+        return {c: deltas[c] for c in streams}
+
+    def report(self):
+        if not self.bytes_total:
+            return
+        share = self.bytes_fed / self.bytes_total * 100
+        logger.info(
+            f"Потоковая оценка: подано {self.bytes_fed} из {self.bytes_total} байт "
+            f"({share:.1f}%), ранних остановок {self.early_stops}"
+        )
@@ -0,0 +1,299 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+from pathlib import Path
+
+from . import normalize
+from .manifest import DEFAULT_MANIFEST_PATH, open_manifest
+from .result_cache import hash_file
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_TIMEOUT = 120
+DEFAULT_MAX_MEMORY = 2048
+PROGRESS_INTERVAL = 10
+# Меняется вместе с форматом извлечённого текста: все PDF будут сконвертированы заново.
+EXTRACTOR_VERSION = 1
+
+def extract_text_from_pdf(pdf_path, txt_path):
+    """
+    Текст дописывается в txt_path.part по страницам и переименовывается
+    в txt_path в конце: весь документ в памяти не собирается, а прерванная
+    конвертация не оставляет неполного .txt.
+    """
+    from PyPDF2 import PdfReader
+    part = txt_path + ".part"
+    try:
+        reader = PdfReader(pdf_path)
+        with open(part, "w", encoding="utf-8") as txt_file:
+            for page in reader.pages:
+                page_text = page.extract_text()
+                if page_text:
+                    txt_file.write(page_text + "\n")
+            txt_file.flush()
+            os.fsync(txt_file.fileno())
+        os.replace(part, txt_path)
+        return True
+    except Exception as e:
+        print(f"Ошибка при обработке файла {pdf_path}: {e}")
+        if os.path.exists(part):
+            os.remove(part)
+        return False
+
+def _convert(pdf_path, txt_path, max_memory):
+    """Рабочий процесс: один PDF с ограничением памяти max_memory МБ."""
+    if max_memory and resource is not None:
+        limit = max_memory * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    sys.exit(0 if extract_text_from_pdf(pdf_path, txt_path) else 1)
+
+def collect_files(input_folder, output_folder):
+    """Пары (pdf, txt) с сохранением структуры каталогов."""
+    files = []
+    for root, _, names in os.walk(input_folder):
+        rel = os.path.relpath(root, input_folder)
+        target_dir = os.path.join(output_folder, rel)
+        os.makedirs(target_dir, exist_ok=True)
+        for name in sorted(names):
+            if name.lower().endswith(".pdf"):
+                files.append((os.path.join(root, name),
+                              os.path.join(target_dir, f"{Path(name).stem}.txt")))
+    return files
+
+def adoptable(txt_path, st):
+    """
+    Можно ли внести в манифест .txt, созданный без него: файл не пустой,
+    записан не раньше PDF (stat st) и рядом нет .part прерванной конвертации.
+    """
+    try:
+        tst = os.stat(txt_path)
+    except FileNotFoundError:
+        return False
+    return (
+        tst.st_size > 0
+        and tst.st_mtime_ns >= st.st_mtime_ns
+        and not os.path.exists(txt_path + ".part")
+    )
+
+def plan_file(pdf_path, txt_path, entry, extractor, force=False, adopt=False):
+    """
+    Решение по одному PDF: ("skip" | "touch" | "adopt" | "convert", stat, хеш).
+    Хеш PDF считается, только если stat не совпал с манифестом или PDF новый.
+    .txt без записи в манифесте конвертируется заново, с adopt — принимается,
+    если проходит adoptable.
+    """
+    st = os.stat(pdf_path)
+    if entry is None:
+        if adopt and not force and adoptable(txt_path, st):
+            return "adopt", st, hash_file(pdf_path)
+        return "convert", st, hash_file(pdf_path)
+    txt_ok = (
+        entry["txt"] == os.path.abspath(txt_path)
+        and os.path.exists(txt_path)
+        and os.path.getsize(txt_path) == entry["txt_size"]
+    )
+    if (st.st_size, st.st_mtime_ns) == (entry["size"], entry["mtime"]):
+        if txt_ok and entry["extractor"] == extractor and not force:
+            return "skip", st, entry["sha256"]
+        return "convert", st, entry["sha256"]
+    sha = hash_file(pdf_path)
+    if sha == entry["sha256"] and txt_ok and entry["extractor"] == extractor and not force:
+        return "touch", st, sha
+    return "convert", st, sha
+
+def record(manifest, pdf_path, txt_path, st, sha, extractor):
+    manifest.put(
+        os.path.abspath(pdf_path), st.st_size, st.st_mtime_ns, sha, extractor,
+        os.path.abspath(txt_path), os.path.getsize(txt_path), hash_file(txt_path)
+    )
+
+def process_folder(input_folder, output_folder, jobs=None, timeout=DEFAULT_TIMEOUT,
+                   max_memory=DEFAULT_MAX_MEMORY, manifest=None, force=False, normalizer=None,
+                   adopt=False):
+    """
+    Конвертация в пуле процессов: PyPDF2 написан на чистом Python, и потоки
+    упираются в GIL. Каждый PDF обрабатывается в своём процессе, который
+    снимается по таймауту, а при ограничении памяти завершается с ошибкой,
+    не останавливая остальные файлы.
+
+    С манифестом конвертируются только новые и изменённые PDF, а также те,
+    у которых пропал или изменился .txt или сменилась версия извлечения.
+    .txt, которых нет в манифесте (например, от старого конвертера, который
+    мог оставить неполный файл), по умолчанию конвертируются заново; с adopt
+    проверенные adoptable вносятся в манифест без конвертации.
+    Без манифеста, как раньше, пропускается PDF, для которого уже есть .txt.
+    С normalizer рядом с каждым новым .txt сразу сохраняется нормализованная копия.
+    """
+    # Импорт до запуска процессов: при fork они получают модуль готовым.
+    import PyPDF2
+    extractor = f"PyPDF2 {PyPDF2.__version__}, v{EXTRACTOR_VERSION}"
+    jobs = jobs or os.cpu_count() or 1
+    if max_memory and resource is None:
+        print("Ограничение памяти на этой платформе не поддерживается")
+
+    entries = manifest.entries() if manifest is not None else {}
+    pending = deque()
+    info = {}
+    skipped = adopted = reconverted = 0
+    present = set()
+    for pdf_path, txt_path in collect_files(input_folder, output_folder):
+        key = os.path.abspath(pdf_path)
+        present.add(key)
+        if manifest is None:
+            if os.path.exists(txt_path) and not force:
+                print(f"Пропущен: {txt_path} уже существует")
+                skipped += 1
+            else:
+                pending.append((pdf_path, txt_path))
+            continue
+        entry = entries.get(key)
+        action, st, sha = plan_file(pdf_path, txt_path, entry, extractor, force, adopt)
+        if action == "convert":
+            if entry is None and os.path.exists(txt_path):
+                reconverted += 1
+            info[pdf_path] = (st, sha)
+            pending.append((pdf_path, txt_path))
+            continue
+        if action == "touch":
+            manifest.touch(key, st.st_size, st.st_mtime_ns)
+        elif action == "adopt":
+            record(manifest, pdf_path, txt_path, st, sha, extractor)
+            adopted += 1
+        skipped += 1
+
+    if manifest is not None:
+        root = os.path.abspath(input_folder) + os.sep
+        gone = [p for p in entries if p.startswith(root) and p not in present]
+        if gone:
+            manifest.remove(gone)
+            print(f"Из манифеста удалено записей об удалённых PDF: {len(gone)}")
+        if adopted:
+            print(f"В манифест внесено {adopted} уже существующих .txt без конвертации "
+                  f"(--force сконвертирует всё заново)")
+        if reconverted and not force:
+            print(f"Существующих .txt без записи в манифесте: {reconverted}, они конвертируются заново"
+                  + ("" if adopt else " (--adopt-existing принимает непустые .txt без конвертации)"))
+
+    total = len(pending)
+    done = errors = timeouts = 0
+    running = {}
+    start = last = time.monotonic()
+    while pending or running:
+        while pending and len(running) < jobs:
+            pdf_path, txt_path = pending.popleft()
+            print(f"Обработка: {pdf_path} → {txt_path}")
+            proc = multiprocessing.Process(
+                target=_convert, args=(pdf_path, txt_path, max_memory), daemon=True
+            )
+            proc.start()
+            running[proc] = (pdf_path, txt_path, time.monotonic())
+
+        wait([p.sentinel for p in running], timeout=1)
+        now = time.monotonic()
+        for proc, (pdf_path, txt_path, started) in list(running.items()):
+            if proc.exitcode is None:
+                if not timeout or now - started < timeout:
+                    continue
+                proc.kill()
+                proc.join()
+                if os.path.exists(txt_path + ".part"):
+                    os.remove(txt_path + ".part")
+                print(f"Таймаут {timeout} с: {pdf_path}")
+                timeouts += 1
+            else:
+                proc.join()
+                if proc.exitcode == 0:
+                    if manifest is not None:
+                        st, sha = info[pdf_path]
+                        record(manifest, pdf_path, txt_path, st, sha, extractor)
+                    if normalizer is not None:
+                        normalizer.path(txt_path)
+                    done += 1
+                else:
+                    if proc.exitcode < 0:
+                        print(f"Процесс для {pdf_path} завершён сигналом {-proc.exitcode}")
+                    errors += 1
+            del running[proc]
+
+        if now - last >= PROGRESS_INTERVAL:
+            last = now
+            finished = done + errors + timeouts
+            rate = finished / (now - start)
+            eta = (total - finished) / rate if rate else 0
+            print(f"Прогресс: {finished}/{total}, ошибок {errors}, таймаутов {timeouts}, "
+                  f"{rate:.1f} файл/с, осталось ~{eta:.0f} с")
+
+    elapsed = time.monotonic() - start
+    print(f"Итого: сконвертировано {done}, пропущено {skipped}, ошибок {errors}, "
+          f"таймаутов {timeouts} за {elapsed:.1f} с ({jobs} процессов)")
+    return done, skipped, errors, timeouts
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Конвертирует PDF-файлы в текстовые файлы, сохраняя структуру каталогов."
+    )
+    parser.add_argument(
+        "input_folder", nargs="?", default="Articless_pdf",
+        help="Папка с исходными PDF (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "output_folder", nargs="?", default="Articless_arXiv",
+        help="Папка для сохранения TXT (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Число процессов (по умолчанию — число ядер)"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TIMEOUT,
+        help="Таймаут на один PDF в секундах, 0 — без ограничения (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "--max-memory", type=int, default=DEFAULT_MAX_MEMORY,
+        help="Ограничение памяти процесса на один PDF в МБ, 0 — без ограничения (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "--manifest", default=DEFAULT_MANIFEST_PATH,
+        help="Файл манифеста конвертации (по умолчанию %(default)s)"
+    )
+    parser.add_argument(
+        "--no-manifest", action="store_true",
+        help="Без манифеста: пропускать PDF, для которых уже есть .txt"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Сконвертировать все PDF заново"
+    )
+    parser.add_argument(
+        "--adopt-existing", action="store_true",
+        help="Внести в манифест без конвертации уже существующие .txt: непустые, "
+             "не старше PDF и без незавершённого .part"
+    )
+    normalize.add_arguments(parser)
+    args = parser.parse_args(argv)
+    normalizer = normalize.from_args(parser, args)
+
+    if not os.path.isdir(args.input_folder):
+        print(f"Папка с PDF не найдена: {args.input_folder}")
+        return
+
+    os.makedirs(args.output_folder, exist_ok=True)
+    manifest = None if args.no_manifest else open_manifest(args.manifest)
+    try:
+        process_folder(args.input_folder, args.output_folder, args.jobs, args.timeout,
+                       args.max_memory, manifest, args.force, normalizer, args.adopt_existing)
+    finally:
+        if manifest is not None:
+            manifest.close()
+    print("Обработка завершена!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,504 @@
+import os
+import argparse
+import subprocess
+import tempfile
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .backends import BACKENDS, PROJECT_DIR, find_7z, make_backend
+from .matrix_store import DEFAULT_STORE_PATH, open_store, store_settings
+from .result_cache import hash_file
+from . import metrics, normalize
+from .metrics import METRICS
+
+def compressed_size_file(path, zip_tool):
+    archive = tempfile.mktemp(suffix='.7z')
+    try:
+        with METRICS.timer("7z_spawn"):
+            subprocess.run([zip_tool, 'a', '-t7z', '-mx=9', archive, path],
+                           capture_output=True, check=True)
+        METRICS.count("spawns")
+        METRICS.count("temp_files")
+        return os.path.getsize(archive) or 1
+    except subprocess.CalledProcessError:
+        return 1
+    finally:
+        if os.path.exists(archive):
+            os.remove(archive)
+
+def _combined_size(file_j, file_i, zip_tool):
+    combo = tempfile.mktemp(suffix='.txt')
+    try:
+        with open(combo, 'wb') as c, open(file_j, 'rb') as a, open(file_i, 'rb') as b:
+            c.write(a.read()); c.write(b.read())
+        METRICS.count("temp_files")
+        return compressed_size_file(combo, zip_tool)
+    finally:
+        if os.path.exists(combo):
+            os.remove(combo)
+
+_pair_backend = None
+_pair_zip_tool = None
+_pair_corpus = None
+_pair_texts = (None, {})
+_pair_worker = False
+
+def _init_pair_worker(backend, zip_tool, corpus, profile=None):
+    """
+    corpus: {категория: файлы} или {категория: уже прочитанные тексты}.
+    profile задаётся только в рабочем процессе пула: его метрики
+    обнуляются и возвращаются родителю вместе с каждым столбцом.
+    """
+    global _pair_backend, _pair_zip_tool, _pair_corpus, _pair_texts, _pair_worker
+    _pair_backend, _pair_zip_tool, _pair_corpus = backend, zip_tool, corpus
+    _pair_texts = (None, {})
+    _pair_worker = profile is not None
+    if _pair_worker:
+        # При fork рабочий процесс наследует накопленные родителем метрики.
+        METRICS.snapshot(reset=True)
+        METRICS.enabled = profile
+
+def _text(key, idx):
+    """
+    Текст idx категории key в рабочем процессе. Файлы читаются при первом
+    обращении, в памяти хранятся тексты только текущей категории: задачи
+    одной категории идут подряд, а весь корпус рабочему не передаётся.
+    """
+    global _pair_texts
+    item = _pair_corpus[key][idx]
+    if isinstance(item, bytes):
+        return item
+    if _pair_texts[0] != key:
+        _pair_texts = (key, {})
+    texts = _pair_texts[1]
+    data = texts.get(idx)
+    if data is None:
+        with METRICS.timer("read_article"):
+            with open(item, 'rb') as f:
+                data = texts[idx] = f.read()
+        METRICS.count("bytes_read", len(data))
+    return data
+
+def _compute_column(task):
+    """
+    Столбец j матрицы категории: C(x_j) и приросты C(x_j + x_i) - C(x_j)
+    для строк i. В памяти текст j сжимается один раз, к нему по очереди
+    добавляются тексты i; без бэкенда — 7z на каждую пару.
+    """
+    key, j, rows = task
+    if _pair_backend is None:
+        items = _pair_corpus[key]
+        first_j = compressed_size_file(items[j], _pair_zip_tool)
+        deltas = [_combined_size(items[j], items[i], _pair_zip_tool) - first_j for i in rows]
+    else:
+        state, first_j = _pair_backend.prime_sized(_text(key, j))
+        first_j = first_j or 1
+        deltas = [_pair_backend.score_data(state, _text(key, i)) for i in rows]
+    return key, j, first_j, deltas, METRICS.snapshot(reset=True) if _pair_worker and METRICS.enabled else None
+
+def _run_columns(backend, zip_tool, corpus, tasks, jobs=None):
+    """
+    Выдавать результаты _compute_column по мере готовности. Корпус
+    (обычно пути к файлам) передаётся рабочим процессам один раз при
+    старте пула, задача — только номера; jobs=1 считает в текущем процессе.
+    Метрики рабочих процессов добавляются в METRICS родителя.
+    """
+    if jobs == 1:
+        _init_pair_worker(backend, zip_tool, corpus)
+        for key, j, first_j, deltas, _ in map(_compute_column, tasks):
+            yield key, j, first_j, deltas
+        return
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_pair_worker,
+        initargs=(backend, zip_tool, corpus, METRICS.enabled)
+    ) as executor:
+        futures = [executor.submit(_compute_column, task) for task in tasks]
+        for future in as_completed(futures):
+            key, j, first_j, deltas, snap = future.result()
+            METRICS.merge(snap)
+            yield key, j, first_j, deltas
+
+def load_texts(files):
+    texts = []
+    for path in files:
+        with open(path, 'rb') as f:
+            texts.append(f.read())
+    return texts
+
+def compressed_sizes(texts, backend):
+    with METRICS.timer("matrix_first"):
+        return [len(backend.compress(t)) or 1 for t in texts]
+
+def compute_columns(texts, backend, first, tasks, jobs=None):
+    """Задачи (j, строки) по одному набору текстов: выдаёт (j, отношения столбца) по мере готовности."""
+    rows_of = dict(tasks)
+    for _, j, _, deltas in _run_columns(backend, None, {None: texts}, [(None, j, r) for j, r in tasks], jobs):
+        yield j, [d / first[i] for i, d in zip(rows_of[j], deltas)]
+
+def build_matrix_in_memory(texts, backend, jobs=None, symmetric=False):
+    """
+    Та же матрица (C(x_j + x_i) - C(x_j)) / C(x_i), но сжатием в памяти,
+    по столбцам через compute_columns. symmetric=True считает только
+    верхний треугольник (i <= j) и отражает его.
+    """
+    n = len(texts)
+    first = compressed_sizes(texts, backend)
+    tasks = [(j, range(j + 1) if symmetric else range(n)) for j in range(n)]
+    mat = np.zeros((n, n))
+
+    with METRICS.timer("matrix_pairs"):
+        for j, column in compute_columns(texts, backend, first, tasks, jobs):
+            rows = list(tasks[j][1])
+            mat[rows, j] = column
+            if symmetric:
+                mat[j, rows] = column
+    METRICS.count("pairs", sum(len(rows) for _, rows in tasks))
+    return mat
+
+def reference_sample(texts, m, seed=0, stratified=True):
+    """
+    m опорных документов. stratified=True делит документы по длине на m
+    равных слоёв и берёт по одному случайному из каждого.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(texts)
+    if not stratified:
+        return sorted(rng.choice(n, size=m, replace=False).tolist())
+    by_length = sorted(range(n), key=lambda i: len(texts[i]))
+    return sorted(int(rng.choice(layer)) for layer in np.array_split(by_length, m))
+
+def select_from_columns(mat, rows, cols, k):
+    """
+    Жадный выбор как в select_core_indices по прямоугольной матрице
+    mat[строка, столбец] (номера документов в rows и cols): столбец с
+    наименьшим средним по ещё не выбранным строкам; NaN не учитываются.
+    """
+    rows = np.asarray(rows)
+    cols = list(cols)
+    alive = np.ones(len(cols), dtype=bool)
+    core = []
+    while len(core) < k and alive.any():
+        sub = mat[~np.isin(rows, core)]
+        counts = (~np.isnan(sub)).sum(axis=0)
+        sums = np.nansum(sub, axis=0)
+        avg = np.full(len(cols), np.inf)
+        ok = alive & (counts > 0)
+        avg[ok] = sums[ok] / counts[ok]
+        idx = int(np.argmin(avg)) if ok.any() else int(np.flatnonzero(alive)[0])
+        core.append(cols[idx])
+        alive[idx] = False
+    return core
+
+def select_core_approx(texts, backend, k, m, refine=0, jobs=None, seed=0, stratified=True):
+    """
+    Приближённый выбор ядра за O(n·m) сжатий вместо n²: каждый документ j
+    оценивается только по m опорным документам (пары документа с самим
+    собой не учитываются). refine > 0 — второй проход: для refine лучших
+    кандидатов столбцы считаются по всем документам, и выбор повторяется
+    на них.
+    """
+    n = len(texts)
+    first = compressed_sizes(texts, backend)
+    ref = reference_sample(texts, min(m, n), seed, stratified)
+    mat = np.empty((len(ref), n))
+    with METRICS.timer("matrix_pairs"):
+        for j, column in compute_columns(texts, backend, first, [(j, ref) for j in range(n)], jobs):
+            mat[:, j] = column
+    METRICS.count("pairs", n * len(ref))
+    for a, r in enumerate(ref):
+        mat[a, r] = np.nan
+
+    if not refine:
+        return select_from_columns(mat, ref, range(n), k)
+
+    ranked = select_from_columns(mat, ref, range(n), max(k, refine))
+    cand = sorted(ranked)
+    full = np.empty((n, len(cand)))
+    with METRICS.timer("matrix_refine"):
+        tasks = [(j, range(n)) for j in cand]
+        col = {j: b for b, j in enumerate(cand)}
+        for j, column in compute_columns(texts, backend, first, tasks, jobs):
+            full[:, col[j]] = column
+    METRICS.count("pairs", n * len(cand))
+    return select_from_columns(full, range(n), cand, k)
+
+class CategoryPlan:
+    """
+    Матрица одной категории в планировщике: уже известные размеры и
+    отношения (из хранилища) и столбцы, которые осталось посчитать.
+    """
+
+    def __init__(self, name, files, backend, store=None, symmetric=False):
+        self.name = name
+        self.files = files
+        self.symmetric = symmetric
+        self.settings = store_settings(backend)
+        n = len(files)
+        self.removed = 0
+        if store is not None:
+            with METRICS.timer("hash_files"):
+                self.hashes = [hash_file(f) for f in files]
+            self.removed = store.prune(name, set(self.hashes))
+            known_first = store.sizes(name, self.settings)
+            known = store.ratios(name, self.settings)
+        else:
+            self.hashes = list(files)
+            known_first, known = {}, {}
+        self.first = [known_first.get(h) for h in self.hashes]
+        self.new_files = sum(size is None for size in self.first)
+
+        self.mat = np.zeros((n, n))
+        self.tasks = []
+        for j in range(n):
+            rows = []
+            for i in (range(j + 1) if symmetric else range(n)):
+                ratio = known.get((self.hashes[i], self.hashes[j]))
+                if ratio is None and symmetric:
+                    ratio = known.get((self.hashes[j], self.hashes[i]))
+                if ratio is None:
+                    rows.append(i)
+                else:
+                    self.mat[i, j] = ratio
+            if rows or self.first[j] is None:
+                self.tasks.append((j, rows))
+        self.pending = len(self.tasks)
+        self.pairs = sum(len(rows) for _, rows in self.tasks)
+        self.work = self.pairs + len(self.tasks)
+        self.reused = (n * (n + 1) // 2 if symmetric else n * n) - self.pairs
+        self._rows = dict(self.tasks)
+        self._deltas = []
+
+    def add(self, j, first_j, deltas):
+        self.first[j] = first_j
+        self._deltas.append((j, self._rows[j], deltas))
+        self.pending -= 1
+
+    def finish(self, store=None):
+        """Собрать матрицу, когда все столбцы посчитаны, и сохранить новое в хранилище."""
+        computed = []
+        for j, rows, deltas in self._deltas:
+            for i, delta in zip(rows, deltas):
+                ratio = delta / self.first[i]
+                self.mat[i, j] = ratio
+                computed.append(((self.hashes[i], self.hashes[j]), ratio))
+        self._deltas = []
+        if store is not None:
+            store.put_sizes(self.name, self.settings, zip(self.hashes, self.first))
+            store.put_ratios(self.name, self.settings, computed)
+        if self.symmetric:
+            self.mat = np.triu(self.mat) + np.triu(self.mat, 1).T
+        METRICS.count("pairs", len(computed))
+        METRICS.count("pairs_reused", self.reused)
+        return self.mat
+
+class Progress:
+    """Общий прогресс сжатий по всем категориям и оценка оставшегося времени."""
+
+    def __init__(self, total, interval=2.0):
+        self.total = total
+        self.done = 0
+        self.interval = interval
+        self.start = time.monotonic()
+        self._last = self.start
+
+    def update(self, n, force=False):
+        self.done += n
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        elapsed = now - self.start
+        eta = elapsed / self.done * (self.total - self.done) if self.done else 0
+        pct = self.done / self.total * 100 if self.total else 100.0
+        print(
+            f"[{self.done}/{self.total} сжатий, {pct:.1f}%] "
+            f"прошло {_fmt_time(elapsed)}, осталось ~{_fmt_time(eta)}",
+            flush=True
+        )
+
+def _fmt_time(seconds):
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h}:{m:02d}:{s:02d}"
+
+def build_matrices(categories, zip_tool, backend=None, jobs=None, symmetric=False, store=None,
+                   on_done=None, progress=True):
+    """
+    Матрицы нескольких категорий {имя: файлы} на одном общем пуле.
+    Столбцы больших категорий ставятся в очередь первыми, очередь общая, так
+    что хвост одной категории идёт вперемешку с началом следующей. Как
+    только все столбцы категории посчитаны, вызывается
+    on_done(имя, файлы, матрица). Возвращает {имя: матрица}.
+    """
+    in_memory = backend is not None and backend.in_memory
+    plans = sorted(
+        (CategoryPlan(name, files, backend, store, symmetric) for name, files in categories.items()),
+        key=lambda plan: (-plan.work, plan.name)
+    )
+    # Только пути: тексты читают рабочие процессы, по одной категории за раз.
+    corpus = {plan.name: plan.files for plan in plans if plan.tasks}
+    tasks = [(plan.name, j, rows) for plan in plans for j, rows in plan.tasks]
+    by_name = {plan.name: plan for plan in plans}
+    meter = Progress(sum(plan.work for plan in plans)) if progress else None
+    results = {}
+
+    def finish(plan):
+        with METRICS.timer("matrix_finish"):
+            results[plan.name] = plan.finish(store)
+        if progress:
+            print(
+                f"{plan.name}: пар из хранилища {plan.reused}, посчитано {plan.pairs}, "
+                f"новых файлов {plan.new_files}, удалено {plan.removed}",
+                flush=True
+            )
+        if on_done is not None:
+            on_done(plan.name, plan.files, results[plan.name])
+
+    for plan in plans:
+        if not plan.tasks:
+            finish(plan)
+
+    with METRICS.timer("matrix_pairs"):
+        for name, j, first_j, deltas in _run_columns(backend if in_memory else None,
+                                                      zip_tool, corpus, tasks, jobs):
+            plan = by_name[name]
+            plan.add(j, first_j, deltas)
+            if meter:
+                meter.update(len(deltas) + 1)
+            if plan.pending == 0:
+                finish(plan)
+    if meter:
+        meter.update(0, force=True)
+    return results
+
+def build_compression_matrix(files, zip_tool, backend=None, jobs=None, symmetric=False,
+                             store=None, category=None):
+    """
+    Матрица попарного сжатия одной категории, см. build_matrices. С бэкендом
+    сжатия в памяти тексты читаются один раз и 7z не запускается, иначе — 7z
+    на каждую пару. С хранилищем store пересчитываются только новые и
+    изменённые файлы.
+    """
+    name = category or ""
+    return build_matrices({name: files}, zip_tool, backend, jobs, symmetric, store, progress=False)[name]
+
+def select_core_indices(mat, k):
+    idxs = list(range(mat.shape[0]))
+    core = []
+    m = mat.copy()
+    while len(core) < k and m.size:
+        avg = m.mean(axis=0)
+        idx = int(np.argmin(avg))
+        core.append(idxs[idx])
+        m = np.delete(np.delete(m, idx, axis=0), idx, axis=1)
+        del idxs[idx]
+    return core
+
+def main(argv=None, prog=None):
+    p = argparse.ArgumentParser(prog=prog, description="Собрать ядра по методу компрессии")
+    p.add_argument("core_size", nargs="?", type=int, default=10,
+                   help="Число файлов в каждом ядре (default: 10)")
+    p.add_argument("txt_folder", nargs="?", default="Articless2",
+                   help="Папка с TXT-файлами по темам (default: Articless2)")
+    p.add_argument("core_folder", nargs="?", default="Cores",
+                   help="Куда сохранять архивы .7z (default: Cores)")
+    p.add_argument("-b", "--backend", choices=sorted(BACKENDS), default="7z",
+                   help="Сжатие для матрицы: 7z -mx=9 на каждую пару, как при классификации, "
+                        "или в памяти (lzma, bz2, zlib) (default: 7z)")
+    p.add_argument("-l", "--level", type=int, default=None,
+                   help="Уровень сжатия бэкенда в памяти")
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help="Число процессов общего пула для всех категорий (default: число ядер CPU)")
+    p.add_argument("--symmetric", action="store_true",
+                   help="Считать матрицу симметричной и сжимать только верхний треугольник")
+    p.add_argument("--approx", type=int, default=None, metavar="M",
+                   help="Приближённый выбор: оценивать документы по M опорным вместо полной матрицы")
+    p.add_argument("--sample", choices=["stratified", "random"], default="stratified",
+                   help="Как выбирать опорные документы: по слоям длины или случайно (default: stratified)")
+    p.add_argument("--refine", type=int, default=0,
+                   help="Второй проход: пересчитать по всем документам столько лучших кандидатов")
+    p.add_argument("--compare-exact", type=int, default=100, metavar="N",
+                   help="С --approx для категорий не больше N файлов посчитать и точный выбор "
+                        "и сообщить совпадение (default: 100, 0 — не сравнивать)")
+    p.add_argument("--seed", type=int, default=0,
+                   help="Зерно выбора опорных документов (default: 0)")
+    p.add_argument("--store", default=DEFAULT_STORE_PATH,
+                   help="Файл SQLite-хранилища размеров и матриц по категориям (default: %(default)s)")
+    p.add_argument("--no-store", action="store_true",
+                   help="Не использовать хранилище матриц, считать всё заново")
+    p.add_argument("--clear-store", action="store_true",
+                   help="Очистить хранилище матриц перед запуском")
+    normalize.add_arguments(p)
+    metrics.add_arguments(p)
+    args = p.parse_args(argv)
+    normalizer = normalize.from_args(p, args)
+    if args.approx is not None and args.backend == "7z":
+        p.error("--approx требует бэкенд сжатия в памяти")
+    if args.profile:
+        metrics.enable(args.profile, args.profile_format)
+
+    # Относительные пути, как и раньше, считаются от папки проекта.
+    txt_root = os.path.join(PROJECT_DIR, args.txt_folder)
+    core_root = os.path.join(PROJECT_DIR, args.core_folder)
+    os.makedirs(core_root, exist_ok=True)
+    zip_tool = find_7z()
+
+    if not os.path.isdir(txt_root) or not os.path.isfile(zip_tool):
+        print("Ошибка: проверьте пути к папкам и 7-Zip")
+        return
+    backend = make_backend(args.backend, zip_tool, args.level)
+    store = None if args.no_store else open_store(args.store, args.clear_store)
+    try:
+        build_cores(args, txt_root, core_root, zip_tool, backend, store, normalizer)
+    finally:
+        if store is not None:
+            store.close()
+
+def write_core(core_root, cat, core_files, zip_tool):
+    archive = os.path.join(core_root, f"{cat}.7z")
+    with METRICS.timer("archive"):
+        subprocess.run([zip_tool, 'a', '-t7z', '-mx=9', archive] + core_files, check=True)
+    METRICS.count("spawns")
+    METRICS.count("categories")
+    print(f"{cat}: создан архив {archive} из {len(core_files)} файлов", flush=True)
+
+def build_cores(args, txt_root, core_root, zip_tool, backend, store=None, normalizer=None):
+    categories = {}
+    for cat in os.listdir(txt_root):
+        d = os.path.join(txt_root, cat)
+        if not os.path.isdir(d):
+            continue
+        files = [
+            os.path.join(d, f)
+            for f in os.listdir(d)
+            if f.lower().endswith('.txt') and os.path.getsize(os.path.join(d, f)) > 0
+        ]
+        if len(files) >= args.core_size:
+            # Матрица и архив ядра строятся по нормализованным копиям.
+            categories[cat] = [normalize.source_path(normalizer, f) for f in files]
+
+    if args.approx is None:
+        def on_done(cat, files, mat):
+            with METRICS.timer("select"):
+                core_idx = select_core_indices(mat, args.core_size)
+            write_core(core_root, cat, [files[i] for i in core_idx], zip_tool)
+
+        build_matrices(categories, zip_tool, backend, args.jobs, args.symmetric, store, on_done)
+        return
+
+    for cat, files in categories.items():
+        texts = load_texts(files)
+        core_idx = select_core_approx(
+            texts, backend, args.core_size, args.approx, args.refine,
+            args.jobs, args.seed, args.sample == "stratified"
+        )
+        if len(files) <= args.compare_exact:
+            mat = build_matrix_in_memory(texts, backend, args.jobs, args.symmetric)
+            exact = select_core_indices(mat, args.core_size)
+            common = len(set(exact) & set(core_idx))
+            print(f"{cat}: совпадение с точным выбором {common} из {len(exact)} файлов")
+        write_core(core_root, cat, [files[i] for i in core_idx], zip_tool)
+
+if __name__ == "__main__":
+    main()